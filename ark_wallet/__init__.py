@@ -3,9 +3,16 @@ Ark Wallet Extension for LNbits
 Secure, self-custodial Ark wallet with Lightning Network integration via Boltz
 """
 import asyncio
+from functools import partial
+from typing import List
+
 from fastapi import APIRouter
+from loguru import logger
 from lnbits.db import Database
 from lnbits.helpers import template_renderer
+from lnbits.tasks import catch_everything_and_restart
+
+from .helpers import ARK_NETWORKS, static_url
 
 db = Database("ext_ark_wallet")
 
@@ -20,8 +27,46 @@ ark_wallet_static_files = [
 
 
 def ark_wallet_renderer():
-    return template_renderer(["ark_wallet/templates"])
+    renderer = template_renderer(["ark_wallet/templates"])
+    renderer.env.globals["ark_static"] = static_url
+    return renderer
 
 
+from .build_static import build as build_static_assets  # noqa
+from .tasks import ark_clients, run_ark_events, run_swap_watchdog, run_vtxo_renewal  # noqa
 from .views import *  # noqa
 from .views_api import *  # noqa
+
+scheduled_tasks: List[asyncio.Task] = []
+
+
+def ark_wallet_start():
+    # static/dist is not shipped, so every install builds its own
+    try:
+        build_static_assets()
+    except Exception as ex:
+        logger.warning(f"Ark Wallet: static asset build failed, serving unhashed assets: {ex}")
+    
+    loop = asyncio.get_event_loop()
+    funcs = []
+    # One task per network, so a failing network restarts alone
+    for network, settings in ARK_NETWORKS.items():
+        if settings["enabled"]:
+            funcs.append(partial(run_ark_events, network))
+            funcs.append(partial(run_vtxo_renewal, network))
+            funcs.append(partial(run_swap_watchdog, network))
+    for func in funcs:
+        task = loop.create_task(catch_everything_and_restart(func))
+        scheduled_tasks.append(task)
+
+
+def ark_wallet_stop():
+    for task in scheduled_tasks:
+        try:
+            task.cancel()
+        except Exception as ex:
+            logger.warning(ex)
+    scheduled_tasks.clear()
+    
+    # Pooled connections are reopened lazily on the next start
+    asyncio.get_event_loop().create_task(ark_clients.close())
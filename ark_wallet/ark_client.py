@@ -0,0 +1,141 @@
+"""
+Shared Ark server connections for Ark Wallet Extension
+"""
+import asyncio
+import json
+from collections import defaultdict
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Set
+
+import httpx
+from loguru import logger
+
+from .helpers import ARK_NETWORKS
+
+try:
+    import h2  # noqa: F401
+
+    HTTP2 = True
+except ImportError:
+    HTTP2 = False
+
+EventListener = Callable[[dict], Awaitable[None]]
+# Returns the IDs of the wallets an event of a network concerns
+EventRouter = Callable[[str, dict], Iterable[str]]
+
+
+class ArkClientManager:
+    """
+    One pooled connection and one event stream per Ark network.
+
+    Events read from a network's stream are handed to in-process
+    listeners (awaited in order, so a slow listener slows the stream
+    read instead of buffering) and then copied by reference into the
+    bounded queues of the wallets `router` says the event concerns, so
+    fan-out costs are proportional to the wallets involved rather than
+    to all subscribers. A full queue drops its oldest event, so memory
+    stays fixed however far a consumer falls behind.
+    """
+
+    def __init__(
+        self,
+        router: Optional[EventRouter] = None,
+        queue_size: int = 32,
+        max_connections: int = 20,
+        min_backoff: float = 1,
+        max_backoff: float = 60,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ):
+        self.router = router
+        self.queue_size = queue_size
+        self.max_connections = max_connections
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+        self.transport = transport
+
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._listeners: Dict[str, List[EventListener]] = defaultdict(list)
+        self._subscribers: Dict[str, Dict[str, Set[asyncio.Queue]]] = defaultdict(
+            lambda: defaultdict(set)
+        )
+
+    def client(self, network: str) -> httpx.AsyncClient:
+        """Get the pooled HTTP client for a network"""
+        if network not in self._clients:
+            self._clients[network] = httpx.AsyncClient(
+                base_url=ARK_NETWORKS[network]["arkServerUrl"],
+                http2=HTTP2,
+                limits=httpx.Limits(max_connections=self.max_connections),
+                timeout=30,
+                transport=self.transport
+            )
+        return self._clients[network]
+
+    async def request(self, network: str, method: str, path: str, **kwargs) -> Any:
+        """Send a request to the Ark server of a network"""
+        response = await self.client(network).request(method, path, **kwargs)
+        response.raise_for_status()
+        return response.json()
+
+    def add_listener(self, network: str, listener: EventListener) -> None:
+        """Receive every event of a network in-process"""
+        self._listeners[network].append(listener)
+
+    def subscribe(self, network: str, wallet_id: str) -> asyncio.Queue:
+        """Get a bounded queue receiving the events concerning a wallet"""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers[network][wallet_id].add(queue)
+        return queue
+
+    def unsubscribe(self, network: str, wallet_id: str, queue: asyncio.Queue) -> None:
+        """Stop delivering events to a queue"""
+        queues = self._subscribers[network].get(wallet_id)
+        if queues is None:
+            return
+        queues.discard(queue)
+        if not queues:
+            del self._subscribers[network][wallet_id]
+
+    async def publish(self, network: str, event: dict) -> None:
+        """Fan an event out to listeners and subscribed wallets"""
+        for listener in self._listeners[network]:
+            try:
+                await listener(event)
+            except Exception as e:
+                logger.warning(f"Ark Wallet: event listener failed on {network}: {e}")
+
+        if not self.router:
+            return
+
+        subscribers = self._subscribers[network]
+        for wallet_id in self.router(network, event):
+            for queue in subscribers.get(wallet_id, ()):
+                if queue.full():
+                    queue.get_nowait()
+                queue.put_nowait(event)
+
+    async def stream_events(self, network: str) -> None:
+        """Follow a network's event stream, reconnecting with backoff"""
+        backoff = self.min_backoff
+        while True:
+            try:
+                async with self.client(network).stream(
+                    "GET", "/v1/events", timeout=None
+                ) as response:
+                    response.raise_for_status()
+                    backoff = self.min_backoff
+                    async for line in response.aiter_lines():
+                        if not line.strip():
+                            continue
+                        message = json.loads(line)
+                        await self.publish(network, message.get("result", message))
+            except (httpx.HTTPError, json.JSONDecodeError) as e:
+                logger.warning(f"Ark Wallet: event stream for {network} lost: {e}")
+
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, self.max_backoff)
+
+    async def close(self) -> None:
+        """Close all pooled connections"""
+        for client in self._clients.values():
+            await client.aclose()
+        self._clients.clear()
@@ -0,0 +1,149 @@
+"""
+Build fingerprinted, precompressed static assets for Ark Wallet Extension
+
+Runs at extension start; to build by hand: python -m ark_wallet.build_static
+
+Writes content-hashed copies of the assets to static/dist together with
+gzip (and brotli, when installed) variants and a manifest.json mapping
+source paths to hashed names. Files of the last KEEP_BUILDS builds stay
+(listed in manifests.json), so pages loaded before a restart can still
+lazy-load the modules they reference. Minification uses rjsmin/rcssmin when
+installed; CSS falls back to a conservative built-in minifier and JS is
+copied as is.
+"""
+import gzip
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+from pathlib import Path
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import rjsmin
+except ImportError:
+    rjsmin = None
+
+try:
+    import rcssmin
+except ImportError:
+    rcssmin = None
+
+from .helpers import DIST_DIR, STATIC_DIR
+
+KEEP_BUILDS = 5
+
+# Dependencies come first so their hashed names can be substituted into
+# the modules importing them
+ASSETS = [
+    "js/kdf-worker.js",
+    "js/swap.js",
+    "js/ark.js",
+    "js/wallet.js",
+    "css/ark_wallet.css",
+]
+
+
+def minify_css(source: str) -> str:
+    if rcssmin:
+        return rcssmin.cssmin(source)
+    source = re.sub(r"/\*.*?\*/", "", source, flags=re.S)
+    source = re.sub(r"\s+", " ", source)
+    source = re.sub(r"\s*([{};,])\s*", r"\1", source)
+    return source.replace(";}", "}").strip()
+
+
+def minify_js(source: str) -> str:
+    return rjsmin.jsmin(source) if rjsmin else source
+
+
+def build(static_dir: Path = STATIC_DIR, dist_dir: Path = DIST_DIR) -> dict:
+    dist_dir.mkdir(parents=True, exist_ok=True)
+    # Private to this process, several workers may build at once
+    build_dir = Path(tempfile.mkdtemp(prefix=".build-", dir=dist_dir))
+    try:
+        manifest = {}
+        for asset in ASSETS:
+            path = Path(asset)
+            source = (static_dir / path).read_text()
+
+            if path.suffix == ".js":
+                # Point relative imports at already hashed modules
+                for built, hashed in manifest.items():
+                    name = re.escape(Path(built).name)
+                    source = re.sub(rf"(['\"])\./{name}\1", rf"\1./{hashed}\1", source)
+                content = minify_js(source).encode()
+            else:
+                content = minify_css(source).encode()
+
+            digest = hashlib.sha256(content).hexdigest()[:10]
+            hashed = f"{path.stem}.{digest}{path.suffix}"
+            manifest[asset] = hashed
+
+            (build_dir / hashed).write_bytes(content)
+            (build_dir / f"{hashed}.gz").write_bytes(gzip.compress(content, 9, mtime=0))
+            if brotli:
+                (build_dir / f"{hashed}.br").write_bytes(brotli.compress(content))
+
+        # A hashed name always has the same content, so replacing is safe
+        for built in list(build_dir.iterdir()):
+            os.replace(built, dist_dir / built.name)
+
+        manifests = [manifest] + [
+            previous for previous in _read_manifests(dist_dir) if previous != manifest
+        ]
+        manifests = manifests[:KEEP_BUILDS]
+        # Servable before the manifest that makes pages reference them
+        _write_json(build_dir, dist_dir / "manifests.json", manifests)
+        _write_json(build_dir, dist_dir / "manifest.json", manifest)
+        prune(dist_dir, manifests)
+    finally:
+        shutil.rmtree(build_dir, ignore_errors=True)
+    return manifest
+
+
+def prune(dist_dir: Path, manifests: list) -> None:
+    """Delete hashed files no kept build references"""
+    keep = {"manifest.json", "manifests.json"}
+    for manifest in manifests:
+        for hashed in manifest.values():
+            keep.update((hashed, f"{hashed}.gz", f"{hashed}.br"))
+    for path in dist_dir.iterdir():
+        if path.is_file() and not path.name.startswith(".") and path.name not in keep:
+            path.unlink(missing_ok=True)
+
+
+def _read_manifests(dist_dir: Path) -> list:
+    # Builds before manifests.json existed only left their manifest.json
+    for name, wrap in (("manifests.json", list), ("manifest.json", lambda manifest: [manifest])):
+        try:
+            return wrap(json.loads((dist_dir / name).read_text()))
+        except (FileNotFoundError, ValueError):
+            continue
+    return []
+
+
+def _write_json(build_dir: Path, path: Path, content) -> None:
+    # Replaced in one step, readers never see a partial file
+    staged = build_dir / path.name
+    staged.write_text(json.dumps(content, indent=2) + "\n")
+    os.replace(staged, path)
+
+
+def report(manifest: dict) -> None:
+    print(f"{'asset':<24}{'source':>10}{'built':>10}{'gzip':>10}")
+    for asset, hashed in manifest.items():
+        source = (STATIC_DIR / asset).stat().st_size
+        built = (DIST_DIR / hashed).stat().st_size
+        gz = (DIST_DIR / f"{hashed}.gz").stat().st_size
+        print(f"{asset:<24}{source:>10}{built:>10}{gz:>10}")
+
+
+if __name__ == "__main__":
+    report(build())
@@ -1,7 +1,7 @@
 """
 CRUD operations for Ark Wallet Extension
 """
-from typing import Optional, List
+from typing import Optional, List, Tuple
 from lnbits.db import Database
 from lnbits.helpers import urlsafe_short_hash
 from datetime import datetime
@@ -10,9 +10,13 @@ from .models import (
     ArkWallet,
     ArkTransaction,
     BoltzSwap,
+    Vtxo,
+    WatchedAddress,
     CreateWallet,
     SendArk,
-    CreateSwap
+    CreateSwap,
+    CreateVtxo,
+    CreateAddress
 )
 
 db = Database("ext_ark_wallet")
@@ -85,6 +89,18 @@ async def update_wallet_balance(wallet_id: str, balance: int) -> None:
     )
 
 
+async def update_wallet_key(wallet_id: str, encrypted_key: str) -> None:
+    """Replace the encrypted wallet key"""
+    await db.execute(
+        """
+        UPDATE ark_wallet.wallets 
+        SET encrypted_key = ?
+        WHERE id = ?
+        """,
+        (encrypted_key, wallet_id)
+    )
+
+
 async def delete_ark_wallet(wallet_id: str) -> None:
     """Delete an Ark wallet"""
     await db.execute(
@@ -141,6 +157,43 @@ async def create_transaction(
     return transaction
 
 
+async def create_transactions(transactions: List[ArkTransaction]) -> None:
+    """Insert transaction records in bulk, skipping outputs already recorded"""
+    # Stay well under the bound parameter limit of the database
+    chunk_size = 100
+    for start in range(0, len(transactions), chunk_size):
+        chunk = transactions[start:start + chunk_size]
+        values = ", ".join("(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)" for _ in chunk)
+        params = []
+        for tx in chunk:
+            params.extend(
+                (
+                    tx.id,
+                    tx.wallet_id,
+                    tx.tx_type,
+                    tx.amount,
+                    tx.address,
+                    tx.txid,
+                    tx.vout,
+                    tx.status,
+                    tx.network,
+                    tx.created_at.isoformat(),
+                    tx.confirmed_at.isoformat() if tx.confirmed_at else None,
+                    tx.memo
+                )
+            )
+        
+        await db.execute(
+            f"""
+            INSERT INTO ark_wallet.transactions 
+            (id, wallet_id, tx_type, amount, address, txid, vout, status, network, created_at, confirmed_at, memo)
+            VALUES {values}
+            ON CONFLICT (wallet_id, txid, vout) DO NOTHING
+            """,
+            tuple(params)
+        )
+
+
 async def get_transaction(tx_id: str) -> Optional[ArkTransaction]:
     """Get a transaction by ID"""
     row = await db.fetchone(
@@ -247,6 +300,26 @@ async def get_wallet_swaps(wallet_id: str, limit: int = 50) -> List[BoltzSwap]:
     return [BoltzSwap(**row) for row in rows]
 
 
+async def get_pending_swap_timeouts_page(
+    network: str,
+    after_id: str,
+    limit: int
+) -> List[tuple]:
+    """Get (id, timeout_block) of unrefunded submarine swaps, keyset-paged by ID"""
+    rows = await db.fetchall(
+        """
+        SELECT s.id, s.timeout_block FROM ark_wallet.boltz_swaps s
+        JOIN ark_wallet.wallets w ON w.id = s.wallet_id
+        WHERE w.network = ? AND s.status IN ('pending', 'failed') AND s.swap_type = 'submarine'
+        AND s.timeout_block IS NOT NULL AND s.id > ?
+        ORDER BY s.id 
+        LIMIT ?
+        """,
+        (network, after_id, limit)
+    )
+    return [(row["id"], row["timeout_block"]) for row in rows]
+
+
 async def update_boltz_swap(
     swap_id: str,
     status: str,
@@ -280,3 +353,249 @@ async def update_boltz_swap(
         """,
         tuple(params)
     )
+
+
+# ==================== VTXO CRUD ====================
+
+async def create_vtxo(wallet: ArkWallet, data: CreateVtxo) -> Vtxo:
+    """Register a VTXO for expiry tracking"""
+    vtxo = Vtxo(
+        id=f"{data.txid}:{data.vout}",
+        wallet_id=wallet.id,
+        network=wallet.network,
+        txid=data.txid,
+        vout=data.vout,
+        amount=data.amount,
+        expires_at=data.expires_at,
+        status="pending",
+        created_at=datetime.now()
+    )
+    
+    await db.execute(
+        """
+        INSERT INTO ark_wallet.vtxos 
+        (id, wallet_id, network, txid, vout, amount, expires_at, status, created_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        (
+            vtxo.id,
+            vtxo.wallet_id,
+            vtxo.network,
+            vtxo.txid,
+            vtxo.vout,
+            vtxo.amount,
+            vtxo.expires_at,
+            vtxo.status,
+            vtxo.created_at.isoformat()
+        )
+    )
+    
+    return vtxo
+
+
+async def get_vtxo(vtxo_id: str) -> Optional[Vtxo]:
+    """Get a VTXO by ID"""
+    row = await db.fetchone(
+        "SELECT * FROM ark_wallet.vtxos WHERE id = ?",
+        (vtxo_id,)
+    )
+    return Vtxo(**row) if row else None
+
+
+async def get_wallet_vtxos(wallet_id: str) -> List[Vtxo]:
+    """Get unspent VTXOs for a wallet"""
+    rows = await db.fetchall(
+        """
+        SELECT * FROM ark_wallet.vtxos 
+        WHERE wallet_id = ? AND status != 'spent' 
+        ORDER BY expires_at
+        """,
+        (wallet_id,)
+    )
+    return [Vtxo(**row) for row in rows]
+
+
+async def get_pending_vtxos_page(
+    network: str,
+    until: int,
+    after: Tuple[int, str],
+    limit: int
+) -> List[Vtxo]:
+    """Get pending VTXOs expiring before `until`, keyset-paged after (expires_at, id)"""
+    after_expiry, after_id = after
+    rows = await db.fetchall(
+        """
+        SELECT * FROM ark_wallet.vtxos 
+        WHERE network = ? AND status = 'pending' AND expires_at <= ?
+        AND (expires_at > ? OR (expires_at = ? AND id > ?))
+        ORDER BY expires_at, id 
+        LIMIT ?
+        """,
+        (network, until, after_expiry, after_expiry, after_id, limit)
+    )
+    return [Vtxo(**row) for row in rows]
+
+
+async def update_vtxos_status(
+    vtxo_ids: List[str],
+    status: str,
+    round_id: Optional[str] = None,
+    only_if: Optional[Tuple[str, ...]] = None
+) -> None:
+    """
+    Update the status of a batch of VTXOs. With `only_if`, rows whose
+    current status is not listed (e.g. spent meanwhile) are left alone.
+    """
+    renewed_at = datetime.now().isoformat() if status == "renewed" else None
+    guard = ""
+    guard_params: Tuple[str, ...] = ()
+    if only_if:
+        guard = f"status IN ({', '.join('?' for _ in only_if)}) AND "
+        guard_params = tuple(only_if)
+    
+    # Stay well under the bound parameter limit of the database
+    chunk_size = 500
+    for start in range(0, len(vtxo_ids), chunk_size):
+        chunk = vtxo_ids[start:start + chunk_size]
+        placeholders = ", ".join("?" for _ in chunk)
+        
+        await db.execute(
+            f"""
+            UPDATE ark_wallet.vtxos 
+            SET status = ?, round_id = ?, renewed_at = ?
+            WHERE {guard}id IN ({placeholders})
+            """,
+            (status, round_id, renewed_at, *guard_params, *chunk)
+        )
+
+
+async def confirm_renewed_vtxos(vtxo_ids: List[str], round_id: str) -> None:
+    """Mark registered VTXOs spent by a finalized round as renewed"""
+    renewed_at = datetime.now().isoformat()
+    
+    chunk_size = 500
+    for start in range(0, len(vtxo_ids), chunk_size):
+        chunk = vtxo_ids[start:start + chunk_size]
+        placeholders = ", ".join("?" for _ in chunk)
+        
+        await db.execute(
+            f"""
+            UPDATE ark_wallet.vtxos 
+            SET status = 'renewed', round_id = ?, renewed_at = ?
+            WHERE status = 'registered' AND id IN ({placeholders})
+            """,
+            (round_id, renewed_at, *chunk)
+        )
+
+
+async def get_registered_vtxos(network: str) -> List[Vtxo]:
+    """Get VTXOs registered for a round that has not been confirmed yet"""
+    rows = await db.fetchall(
+        """
+        SELECT * FROM ark_wallet.vtxos 
+        WHERE network = ? AND status = 'registered'
+        """,
+        (network,)
+    )
+    return [Vtxo(**row) for row in rows]
+
+
+async def release_renewing_vtxos(network: str) -> None:
+    """Return VTXOs left mid-round by an interrupted renewal to pending"""
+    await db.execute(
+        """
+        UPDATE ark_wallet.vtxos 
+        SET status = 'pending'
+        WHERE network = ? AND status = 'renewing'
+        """,
+        (network,)
+    )
+
+
+# ==================== ADDRESS CRUD ====================
+
+async def create_address(wallet: ArkWallet, data: CreateAddress) -> WatchedAddress:
+    """Watch a receive address for incoming payments"""
+    address = WatchedAddress(
+        id=urlsafe_short_hash(),
+        wallet_id=wallet.id,
+        network=wallet.network,
+        address=data.address,
+        script=data.script.lower(),
+        created_at=datetime.now()
+    )
+    
+    await db.execute(
+        """
+        INSERT INTO ark_wallet.addresses 
+        (id, wallet_id, network, address, script, created_at)
+        VALUES (?, ?, ?, ?, ?, ?)
+        """,
+        (
+            address.id,
+            address.wallet_id,
+            address.network,
+            address.address,
+            address.script,
+            address.created_at.isoformat()
+        )
+    )
+    
+    return address
+
+
+async def get_address(address_id: str) -> Optional[WatchedAddress]:
+    """Get a watched address by ID"""
+    row = await db.fetchone(
+        "SELECT * FROM ark_wallet.addresses WHERE id = ?",
+        (address_id,)
+    )
+    return WatchedAddress(**row) if row else None
+
+
+async def get_address_by_script(network: str, script: str) -> Optional[WatchedAddress]:
+    """Get the watched address paying to a script"""
+    row = await db.fetchone(
+        "SELECT * FROM ark_wallet.addresses WHERE network = ? AND script = ?",
+        (network, script.lower())
+    )
+    return WatchedAddress(**row) if row else None
+
+
+async def get_wallet_addresses(wallet_id: str) -> List[WatchedAddress]:
+    """Get watched addresses for a wallet"""
+    rows = await db.fetchall(
+        """
+        SELECT * FROM ark_wallet.addresses 
+        WHERE wallet_id = ? 
+        ORDER BY created_at DESC
+        """,
+        (wallet_id,)
+    )
+    return [WatchedAddress(**row) for row in rows]
+
+
+async def get_watched_scripts_page(
+    network: str,
+    after_script: str,
+    limit: int
+) -> List[tuple]:
+    """Get (script, wallet_id) of a network's watched addresses, keyset-paged by script"""
+    rows = await db.fetchall(
+        """
+        SELECT script, wallet_id FROM ark_wallet.addresses 
+        WHERE network = ? AND script > ? 
+        ORDER BY script 
+        LIMIT ?
+        """,
+        (network, after_script, limit)
+    )
+    return [(row["script"], row["wallet_id"]) for row in rows]
+
+
+async def delete_address(address_id: str) -> None:
+    """Stop watching an address"""
+    await db.execute(
+        "DELETE FROM ark_wallet.addresses WHERE id = ?",
+        (address_id,)
+    )
@@ -0,0 +1,81 @@
+"""
+Shared helpers for Ark Wallet Extension
+"""
+import json
+from pathlib import Path
+from typing import Any, Callable, Dict, Set, Tuple
+
+STATIC_DIR = Path(__file__).parent / "static"
+DIST_DIR = STATIC_DIR / "dist"
+
+ARK_NETWORKS = {
+    "mainnet": {
+        "arkServerUrl": "https://mainnet.arklabs.to",
+        "boltzApiUrl": "https://api.boltz.exchange",
+        "esploraUrl": "https://mempool.space/api",
+        "enabled": True
+    },
+    "testnet": {
+        "arkServerUrl": "https://testnet.arklabs.to",
+        "boltzApiUrl": "https://api.testnet.boltz.exchange",
+        "esploraUrl": "https://mempool.space/testnet/api",
+        "enabled": True
+    },
+    "mutinynet": {
+        "arkServerUrl": "https://master.mutinynet.arklabs.to",
+        "boltzApiUrl": "https://api.testnet.boltz.exchange",
+        "esploraUrl": "https://mutinynet.com/api",
+        "enabled": True
+    }
+}
+
+# Boltz swap statuses a client may move a swap to from each status;
+# `refundable` is only ever set by the swap timeout watchdog
+SWAP_STATUS_TRANSITIONS = {
+    "pending": {"pending", "completed", "failed"},
+    "failed": {"refunded"},
+    "refundable": {"refunded"},
+    "completed": set(),
+    "refunded": set(),
+}
+
+
+# Build file -> ((inode, mtime), parsed content) of its last read
+_build_files: Dict[str, Tuple[Tuple[int, int], Any]] = {}
+
+
+def _read_build_file(name: str, parse: Callable[[Any], Any], default: Any) -> Any:
+    path = DIST_DIR / name
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return default
+    # Re-read only when a build has replaced the file
+    version = (stat.st_ino, stat.st_mtime_ns)
+    cached = _build_files.get(name)
+    if not cached or cached[0] != version:
+        cached = (version, parse(json.loads(path.read_text())))
+        _build_files[name] = cached
+    return cached[1]
+
+
+def static_manifest() -> Dict[str, str]:
+    """Source path to hashed name of built assets, see build_static.py"""
+    return _read_build_file("manifest.json", dict, {})
+
+
+def static_assets() -> Set[str]:
+    """Hashed names servable from /assets, including recent builds open pages may use"""
+    return _read_build_file(
+        "manifests.json",
+        lambda manifests: {name for manifest in manifests for name in manifest.values()},
+        set()
+    )
+
+
+def static_url(asset: str) -> str:
+    """URL of a static asset, fingerprinted when the build step has run"""
+    hashed = static_manifest().get(asset)
+    if hashed:
+        return f"/ark_wallet/assets/{hashed}"
+    return f"/ark_wallet/static/{asset}"
@@ -0,0 +1,103 @@
+"""
+Incoming payment detection for Ark Wallet Extension
+"""
+from datetime import datetime
+from typing import Dict, List, Set
+
+from lnbits.helpers import urlsafe_short_hash
+from loguru import logger
+
+from .crud import create_transactions, get_watched_scripts_page
+from .models import ArkTransaction, WatchedAddress
+
+
+class PaymentMatcher:
+    """
+    Matches Ark round outputs to the wallets watching their scripts.
+
+    Every watched output script lives in one dict per network, so
+    matching a batch of outputs costs one lookup per output regardless
+    of how many scripts are watched. Each network's index is loaded once
+    when its event stream starts and then kept in step as addresses are
+    added or removed.
+    """
+
+    def __init__(self, load_limit: int = 10000):
+        self.load_limit = load_limit
+        self._scripts: Dict[str, Dict[str, str]] = {}
+
+    def __len__(self) -> int:
+        return sum(len(scripts) for scripts in self._scripts.values())
+
+    async def load(self, network: str) -> None:
+        """Build the index of a network from its watched addresses"""
+        # Merged into the live index, addresses added meanwhile are kept
+        scripts = self._scripts.setdefault(network, {})
+        after_script = ""
+        while True:
+            page = await get_watched_scripts_page(network, after_script, self.load_limit)
+            scripts.update(page)
+            if len(page) < self.load_limit:
+                break
+            after_script = page[-1][0]
+        logger.info(f"Ark Wallet: watching {len(scripts)} receive scripts on {network}")
+
+    def add(self, address: WatchedAddress) -> None:
+        """Start matching an address"""
+        self._scripts.setdefault(address.network, {})[address.script] = address.wallet_id
+
+    def remove(self, address: WatchedAddress) -> None:
+        """Stop matching an address"""
+        self._scripts.get(address.network, {}).pop(address.script, None)
+
+    def wallets_for_outputs(self, network: str, outputs: List[dict]) -> Set[str]:
+        """IDs of the wallets watching any of the outputs' scripts"""
+        scripts = self._scripts.get(network)
+        if not scripts:
+            return set()
+        wallet_ids = (scripts.get(output["script"].lower()) for output in outputs)
+        return {wallet_id for wallet_id in wallet_ids if wallet_id is not None}
+
+    def match(self, network: str, outputs: List[dict]) -> List[ArkTransaction]:
+        """
+        Build `receive` transactions for outputs paying a watched script.
+        Outputs are dicts with `txid`, `vout`, `script` (hex) and `amount`
+        (sats).
+        """
+        scripts = self._scripts.get(network)
+        if not scripts:
+            return []
+
+        now = datetime.now()
+        received = []
+        for output in outputs:
+            wallet_id = scripts.get(output["script"].lower())
+            if wallet_id is None:
+                continue
+            received.append(
+                ArkTransaction(
+                    id=urlsafe_short_hash(),
+                    wallet_id=wallet_id,
+                    tx_type="receive",
+                    amount=output["amount"],
+                    address=output.get("address"),
+                    txid=output["txid"],
+                    vout=output["vout"],
+                    status="confirmed",
+                    network=network,
+                    created_at=now,
+                    confirmed_at=now
+                )
+            )
+        return received
+
+    async def process(self, network: str, outputs: List[dict]) -> int:
+        """
+        Record every output paying a watched script, returns how many
+        matched. Outputs already recorded, e.g. from a re-delivered
+        round, are skipped by the database.
+        """
+        received = self.match(network, outputs)
+        if received:
+            await create_transactions(received)
+        return len(received)
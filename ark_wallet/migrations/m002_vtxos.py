@@ -0,0 +1,39 @@
+"""
+VTXO tracking schema for Ark Wallet Extension
+"""
+
+async def m002_vtxos(db):
+    """
+    VTXOs tracked for expiry renewal
+    """
+    await db.execute(
+        """
+        CREATE TABLE ark_wallet.vtxos (
+            id TEXT PRIMARY KEY,
+            wallet_id TEXT NOT NULL,
+            network TEXT NOT NULL,
+            txid TEXT NOT NULL,
+            vout INTEGER NOT NULL,
+            amount INTEGER NOT NULL,
+            expires_at INTEGER NOT NULL,
+            status TEXT NOT NULL,
+            round_id TEXT,
+            created_at TEXT NOT NULL,
+            renewed_at TEXT,
+            FOREIGN KEY (wallet_id) REFERENCES ark_wallet.wallets(id) ON DELETE CASCADE
+        );
+        """
+    )
+    
+    await db.execute(
+        """
+        CREATE INDEX idx_vtxos_wallet ON ark_wallet.vtxos (wallet_id);
+        """
+    )
+    
+    # Serves the scheduler's keyset paging over pending VTXOs by expiry
+    await db.execute(
+        """
+        CREATE INDEX idx_vtxos_expiry ON ark_wallet.vtxos (network, status, expires_at, id);
+        """
+    )
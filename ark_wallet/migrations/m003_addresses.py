@@ -0,0 +1,33 @@
+"""
+Watched receive addresses for Ark Wallet Extension
+"""
+
+async def m003_addresses(db):
+    """
+    Receive addresses and their output scripts, per wallet
+    """
+    await db.execute(
+        """
+        CREATE TABLE ark_wallet.addresses (
+            id TEXT PRIMARY KEY,
+            wallet_id TEXT NOT NULL,
+            network TEXT NOT NULL,
+            address TEXT NOT NULL,
+            script TEXT NOT NULL,
+            created_at TEXT NOT NULL,
+            FOREIGN KEY (wallet_id) REFERENCES ark_wallet.wallets(id) ON DELETE CASCADE
+        );
+        """
+    )
+    
+    await db.execute(
+        """
+        CREATE INDEX idx_addresses_wallet ON ark_wallet.addresses (wallet_id);
+        """
+    )
+    
+    await db.execute(
+        """
+        CREATE UNIQUE INDEX idx_addresses_script ON ark_wallet.addresses (network, script);
+        """
+    )
@@ -0,0 +1,21 @@
+"""
+Output index on transactions for Ark Wallet Extension
+"""
+
+async def m004_transaction_outputs(db):
+    """
+    Record which output of a transaction a receive is, so the same
+    output can only be recorded once per wallet
+    """
+    await db.execute(
+        """
+        ALTER TABLE ark_wallet.transactions ADD COLUMN vout INTEGER;
+        """
+    )
+    
+    await db.execute(
+        """
+        CREATE UNIQUE INDEX idx_transactions_output 
+        ON ark_wallet.transactions (wallet_id, txid, vout);
+        """
+    )
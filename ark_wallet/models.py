@@ -26,6 +26,7 @@ class ArkTransaction(BaseModel):
     amount: int  # in satoshis
     address: Optional[str] = None
     txid: Optional[str] = None
+    vout: Optional[int] = None  # output index, for received outputs
     status: str  # pending, confirmed, failed
     network: str
     created_at: datetime
@@ -43,13 +44,38 @@ class BoltzSwap(BaseModel):
     invoice: Optional[str] = None
     onchain_address: Optional[str] = None
     swap_id: str  # Boltz swap ID
-    status: str  # pending, completed, failed, refunded
+    status: str  # pending, completed, failed, refundable, refunded
     timeout_block: Optional[int] = None
     created_at: datetime
     completed_at: Optional[datetime] = None
     refund_tx: Optional[str] = None
 
 
+class Vtxo(BaseModel):
+    """Ark virtual UTXO tracked for expiry renewal"""
+    id: str  # txid:vout
+    wallet_id: str
+    network: str
+    txid: str
+    vout: int
+    amount: int  # in satoshis
+    expires_at: int  # unix timestamp
+    status: str  # pending, renewing, registered, renewed, expired, spent
+    round_id: Optional[str] = None  # registration request ID, then round ID
+    created_at: datetime
+    renewed_at: Optional[datetime] = None
+
+
+class WatchedAddress(BaseModel):
+    """Receive address watched for incoming payments"""
+    id: str
+    wallet_id: str
+    network: str
+    address: str
+    script: str  # hex-encoded output script
+    created_at: datetime
+
+
 class CreateWallet(BaseModel):
     """Create wallet request"""
     wallet_name: str
@@ -57,6 +83,11 @@ class CreateWallet(BaseModel):
     encrypted_key: str
 
 
+class UpdateWalletKey(BaseModel):
+    """Replace wallet ciphertext request, e.g. after a KDF upgrade"""
+    encrypted_key: str
+
+
 class SendArk(BaseModel):
     """Send Ark transaction request"""
     wallet_id: str
@@ -72,3 +103,25 @@ class CreateSwap(BaseModel):
     amount: int
     invoice: Optional[str] = None  # For submarine swaps
     onchain_address: Optional[str] = None  # For reverse swaps
+
+
+class CreateVtxo(BaseModel):
+    """Register VTXO request"""
+    txid: str
+    vout: int
+    amount: int
+    expires_at: int  # unix timestamp
+
+
+class CreateAddress(BaseModel):
+    """Watch receive address request"""
+    address: str
+    script: str  # hex-encoded output script
+
+
+class UpdateSwap(BaseModel):
+    """Update Boltz swap request"""
+    status: str
+    boltz_swap_id: Optional[str] = None
+    timeout_block: Optional[int] = None
+    refund_tx: Optional[str] = None
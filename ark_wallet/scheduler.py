@@ -0,0 +1,350 @@
+"""
+VTXO expiry renewal scheduler for Ark Wallet Extension
+"""
+import asyncio
+import heapq
+import time
+from typing import Awaitable, Callable, Dict, List, Set, Tuple
+
+from loguru import logger
+
+from .crud import (
+    confirm_renewed_vtxos,
+    get_pending_vtxos_page,
+    get_registered_vtxos,
+    release_renewing_vtxos,
+    update_vtxos_status
+)
+from .models import Vtxo
+
+# Registers a batch of VTXOs for the next Ark round, returns the request ID
+RenewCallback = Callable[[str, List[Vtxo]], Awaitable[str]]
+
+
+class VtxoRenewalScheduler:
+    """
+    Renews VTXOs of every wallet on one network before they expire.
+
+    Pending VTXOs sit in a min-heap ordered by expiry. Everything due
+    within `renewal_window` is registered with the Ark server as one
+    round participation, at most one round every `min_round_interval`
+    seconds and `max_batch` VTXOs per round. A registered batch only
+    counts as renewed once a finalized round spends it (see `confirm`).
+    VTXOs of a batch that fails or is not confirmed within
+    `registration_timeout` are retried after a per-VTXO exponential
+    backoff starting at `retry_backoff` and capped at `max_retry_backoff`;
+    a VTXO that cannot be retried before its expiry is marked `expired`,
+    so an Ark server that keeps ignoring registrations sees a bounded
+    number of them.
+
+    Only VTXOs expiring within `load_horizon` are held in memory; they
+    are read from the database with keyset paging, so a restart resumes
+    from the index instead of scanning the table.
+    """
+
+    def __init__(
+        self,
+        network: str,
+        renew: RenewCallback,
+        renewal_window: int = 24 * 3600,
+        load_horizon: int = 48 * 3600,
+        refill_interval: int = 600,
+        min_round_interval: int = 60,
+        registration_timeout: int = 600,
+        retry_backoff: int = 600,
+        max_retry_backoff: int = 6 * 3600,
+        max_batch: int = 4096,
+        load_limit: int = 100000,
+        clock: Callable[[], float] = time.time
+    ):
+        self.network = network
+        self.renew = renew
+        self.renewal_window = renewal_window
+        self.load_horizon = load_horizon
+        self.refill_interval = refill_interval
+        self.min_round_interval = min_round_interval
+        self.registration_timeout = registration_timeout
+        self.retry_backoff = retry_backoff
+        self.max_retry_backoff = max_retry_backoff
+        self.max_batch = max_batch
+        self.load_limit = load_limit
+        self.clock = clock
+
+        self._wakeup = asyncio.Event()
+        self._reset()
+
+    def _reset(self) -> None:
+        self._heap: List[Tuple[int, str]] = []
+        self._vtxos: Dict[str, Vtxo] = {}
+        # Last (expires_at, id) read from the database
+        self._cursor: Tuple[int, str] = (0, "")
+        # Every pending VTXO expiring at or before this is in memory
+        self._loaded_until = 0
+        self._last_round = float("-inf")
+        # Request ID -> (registered at, batch) awaiting a finalized round
+        self._registered: Dict[str, Tuple[float, List[Vtxo]]] = {}
+        self._vtxo_requests: Dict[str, str] = {}
+        # IDs of the batch being registered right now
+        self._in_round: Set[str] = set()
+        # Failed registrations per VTXO, and VTXOs waiting out their backoff
+        self._attempts: Dict[str, int] = {}
+        self._retrying: List[Tuple[float, str]] = []
+        self._backoff: Dict[str, Vtxo] = {}
+
+    def schedule(self, vtxo: Vtxo) -> None:
+        """Track a newly registered VTXO"""
+        covered = (
+            vtxo.expires_at <= self._loaded_until
+            or (vtxo.expires_at, vtxo.id) <= self._cursor
+        )
+        # Anything past the loaded range is picked up by the next refill
+        if not covered:
+            return
+
+        self._push(vtxo)
+        if self._heap[0][1] == vtxo.id:
+            self._wakeup.set()
+
+    def discard(self, vtxo_id: str) -> None:
+        """Stop tracking a VTXO, e.g. once it is spent"""
+        # Heap entries are dropped lazily when popped
+        self._vtxos.pop(vtxo_id, None)
+        self._in_round.discard(vtxo_id)
+        self._backoff.pop(vtxo_id, None)
+        self._attempts.pop(vtxo_id, None)
+        request_id = self._vtxo_requests.pop(vtxo_id, None)
+        if request_id in self._registered:
+            registered_at, batch = self._registered[request_id]
+            batch = [vtxo for vtxo in batch if vtxo.id != vtxo_id]
+            if batch:
+                self._registered[request_id] = (registered_at, batch)
+            else:
+                del self._registered[request_id]
+
+    async def confirm(self, round_id: str, spent_vtxo_ids: List[str]) -> None:
+        """Mark registered VTXOs spent by a finalized round as renewed"""
+        renewed = [
+            vtxo_id for vtxo_id in spent_vtxo_ids if vtxo_id in self._vtxo_requests
+        ]
+        if not renewed:
+            return
+
+        await confirm_renewed_vtxos(renewed, round_id)
+        for vtxo_id in renewed:
+            self.discard(vtxo_id)
+        logger.info(
+            f"Ark Wallet: renewed {len(renewed)} VTXOs on {self.network} in round {round_id}"
+        )
+
+    async def resume(self) -> None:
+        """Start over from the database"""
+        # It holds every VTXO that was in flight when a previous run stopped
+        self._reset()
+        await release_renewing_vtxos(self.network)
+        await self._load_registered()
+
+    async def tick(self) -> float:
+        """Do whatever is due now, returns seconds until something is due again"""
+        now = self.clock()
+        await self._expire_registrations(now)
+        self._release_retries(now)
+        await self._refill(now)
+
+        delay = self._next_round_delay(now)
+        if delay <= 0:
+            await self._run_round(now)
+            return 0
+        return delay
+
+    async def run(self) -> None:
+        """Renew VTXOs as they come due, forever"""
+        await self.resume()
+
+        while True:
+            delay = await self.tick()
+            if delay <= 0:
+                continue
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    def _push(self, vtxo: Vtxo) -> None:
+        if vtxo.id in self._vtxos or vtxo.id in self._vtxo_requests or vtxo.id in self._backoff:
+            return
+        self._vtxos[vtxo.id] = vtxo
+        heapq.heappush(self._heap, (vtxo.expires_at, vtxo.id))
+
+    def _track_registration(self, request_id: str, registered_at: float, batch: List[Vtxo]) -> None:
+        self._registered[request_id] = (registered_at, batch)
+        for vtxo in batch:
+            self._vtxo_requests[vtxo.id] = request_id
+
+    async def _load_registered(self) -> None:
+        """Wait again for rounds registered before a restart"""
+        now = self.clock()
+        batches: Dict[str, List[Vtxo]] = {}
+        for vtxo in await get_registered_vtxos(self.network):
+            batches.setdefault(vtxo.round_id or "", []).append(vtxo)
+        for request_id, batch in batches.items():
+            self._track_registration(request_id, now, batch)
+
+    async def _expire_registrations(self, now: float) -> None:
+        """Return batches no finalized round picked up to pending"""
+        expired = [
+            request_id
+            for request_id, (registered_at, _) in self._registered.items()
+            if now - registered_at >= self.registration_timeout
+        ]
+        for request_id in expired:
+            _, batch = self._registered.pop(request_id)
+            for vtxo in batch:
+                self._vtxo_requests.pop(vtxo.id, None)
+            await update_vtxos_status(
+                [vtxo.id for vtxo in batch], "pending", only_if=("registered",)
+            )
+            logger.warning(
+                f"Ark Wallet: registration {request_id} of {len(batch)} VTXOs on "
+                f"{self.network} was not confirmed"
+            )
+            await self._retry_later(batch, now)
+
+    async def _retry_later(self, batch: List[Vtxo], now: float) -> None:
+        """Back a failed batch off per VTXO, giving up on those that would expire first"""
+        expired = []
+        for vtxo in batch:
+            attempts = self._attempts.get(vtxo.id, 0) + 1
+            retry_at = now + min(
+                self.retry_backoff * 2 ** (attempts - 1), self.max_retry_backoff
+            )
+            if retry_at >= vtxo.expires_at:
+                self._attempts.pop(vtxo.id, None)
+                expired.append(vtxo)
+                continue
+            self._attempts[vtxo.id] = attempts
+            self._backoff[vtxo.id] = vtxo
+            heapq.heappush(self._retrying, (retry_at, vtxo.id))
+        await self._expire(expired)
+
+    async def _expire(self, vtxos: List[Vtxo]) -> None:
+        """Stop renewing VTXOs that can no longer be renewed in time"""
+        if not vtxos:
+            return
+        await update_vtxos_status([vtxo.id for vtxo in vtxos], "expired", only_if=("pending",))
+        logger.warning(
+            f"Ark Wallet: {len(vtxos)} VTXOs on {self.network} expired before a round renewed them"
+        )
+
+    def _release_retries(self, now: float) -> None:
+        """Queue VTXOs whose backoff has passed for the next round again"""
+        while self._retrying and self._retrying[0][0] <= now:
+            _, vtxo_id = heapq.heappop(self._retrying)
+            vtxo = self._backoff.pop(vtxo_id, None)
+            if vtxo:
+                self._push(vtxo)
+
+    async def _refill(self, now: float) -> None:
+        """Page pending VTXOs expiring within the load horizon into memory"""
+        horizon = int(now + self.load_horizon)
+
+        while (
+            self._loaded_until < horizon - self.refill_interval
+            and len(self._vtxos) < self.load_limit
+        ):
+            page = await get_pending_vtxos_page(
+                self.network, horizon, self._cursor, self.load_limit
+            )
+            for vtxo in page:
+                self._push(vtxo)
+            if page:
+                self._cursor = (page[-1].expires_at, page[-1].id)
+
+            if len(page) < self.load_limit:
+                self._loaded_until = horizon
+            else:
+                # Later rows may share the cursor's expiry
+                self._loaded_until = self._cursor[0] - 1
+
+    def _next_round_delay(self, now: float) -> float:
+        """Seconds until the next round or expiry is due, capped by the refill interval"""
+        while self._heap and self._heap[0][1] not in self._vtxos:
+            heapq.heappop(self._heap)
+
+        delays = [self.refill_interval]
+        if self._heap:
+            due_at = max(
+                self._heap[0][0] - self.renewal_window,
+                self._last_round + self.min_round_interval
+            )
+            delays.append(due_at - now)
+        while self._retrying and self._retrying[0][1] not in self._backoff:
+            heapq.heappop(self._retrying)
+        if self._retrying:
+            delays.append(max(self._retrying[0][0] - now, 0.001))
+        if self._registered:
+            oldest = min(registered_at for registered_at, _ in self._registered.values())
+            # Expiries are handled at the top of the loop, never as a round
+            delays.append(max(oldest + self.registration_timeout - now, 0.001))
+        return min(delays)
+
+    async def _run_round(self, now: float) -> None:
+        """Register every VTXO due within the renewal window in one round"""
+        self._last_round = now
+        deadline = now + self.renewal_window
+
+        batch: List[Vtxo] = []
+        expired: List[Vtxo] = []
+        while self._heap and len(batch) < self.max_batch:
+            expires_at, vtxo_id = self._heap[0]
+            if expires_at > deadline:
+                break
+            heapq.heappop(self._heap)
+            vtxo = self._vtxos.pop(vtxo_id, None)
+            if not vtxo:
+                continue
+            # e.g. loaded after downtime, too late to register
+            if expires_at <= now:
+                expired.append(vtxo)
+            else:
+                batch.append(vtxo)
+
+        await self._expire(expired)
+        if not batch:
+            return
+
+        vtxo_ids = [vtxo.id for vtxo in batch]
+        self._in_round.update(vtxo_ids)
+        try:
+            await update_vtxos_status(vtxo_ids, "renewing", only_if=("pending",))
+            request_id = await self.renew(self.network, batch)
+            # VTXOs spent while the server was answering stay spent
+            batch = self._still_in_round(batch)
+            await update_vtxos_status(
+                [vtxo.id for vtxo in batch], "registered", request_id, only_if=("renewing",)
+            )
+        except Exception as e:
+            logger.warning(
+                f"Ark Wallet: registering {len(batch)} VTXOs on {self.network} failed: {e}"
+            )
+            batch = self._still_in_round(batch)
+            # Anything left 'renewing' in the database is released on restart
+            await update_vtxos_status(
+                [vtxo.id for vtxo in batch], "pending", only_if=("renewing",)
+            )
+            await self._retry_later(batch, now)
+            return
+        finally:
+            self._in_round.difference_update(vtxo_ids)
+
+        if not batch:
+            return
+        self._track_registration(request_id, now, batch)
+        logger.info(
+            f"Ark Wallet: registered {len(batch)} VTXOs on {self.network} as {request_id}"
+        )
+
+    def _still_in_round(self, batch: List[Vtxo]) -> List[Vtxo]:
+        """Drop batch members discarded while the round was in flight"""
+        return [vtxo for vtxo in batch if vtxo.id in self._in_round]
@@ -4,13 +4,36 @@
  */
 
 import { generateMnemonic, mnemonicToSeed } from 'https://cdn.jsdelivr.net/npm/bip39@3.1.0/src/index.js';
-import QRCode from 'https://cdn.jsdelivr.net/npm/qrcode@1.5.3/build/qrcode.min.js';
+
+const QRCODE_URL = 'https://cdn.jsdelivr.net/npm/qrcode@1.5.3/build/qrcode.min.js';
+
+// Key derivation parameters by ciphertext version; ciphertexts without
+// a version predate the header and are version 1. Raising the cost means
+// adding a version (measured on low-end phones with
+// tests/benchmarks/kdf_timing.html); older ciphertexts are re-encrypted
+// on unlock by migrateKey
+const KDF_VERSIONS = {
+  1: { kdf: 'PBKDF2-SHA256', iterations: 100000 }
+};
+const KDF_VERSION = 1;
+
+// Most PBKDF2 iterations run on the main thread when the worker is
+// unavailable; costlier versions are only derived in the worker
+const INLINE_MAX_ITERATIONS = 100000;
+
+// Unlocked wallets lock again after this long without use
+const SESSION_TIMEOUT = 15 * 60 * 1000;
 
 class ArkWalletCore {
   constructor() {
     this.wallet = null;
     this.config = null;
     this.refreshInterval = null;
+    this.kdfWorker = null;
+    this.kdfWorkerFailed = false;
+    this.kdfRequests = new Map();
+    this.kdfRequestId = 0;
+    this.sessions = new Map();
   }
 
   /**
@@ -76,7 +99,7 @@ class ArkWalletCore {
         .join('');
 
       // Encrypt the private key
-      const encrypted = await this.encryptKey(privateKeyHex, password);
+      const { encrypted, key } = await this.encryptKey(privateKeyHex, password);
       
       // Store wallet in backend
       const walletData = {
@@ -99,6 +122,7 @@ class ArkWalletCore {
       }
 
       const wallet = await response.json();
+      this.unlockSession(wallet.id, key);
 
       return {
         success: true,
@@ -112,9 +136,9 @@ class ArkWalletCore {
   }
 
   /**
-   * Load existing wallet from backend
+   * Load existing wallet from backend, using the session key when unlocked
    */
-  async loadWallet(walletId, password) {
+  async loadWallet(walletId, password = null) {
     try {
       // Fetch wallet from backend
       const response = await fetch(`/ark_wallet/api/wallets/${walletId}`, {
@@ -128,10 +152,24 @@ class ArkWalletCore {
       }
 
       const walletData = await response.json();
-      
-      // Decrypt the private key
       const encrypted = JSON.parse(walletData.encrypted_key);
-      const privateKeyHex = await this.decryptKey(encrypted, password);
+      const session = this.sessions.get(walletId);
+
+      let privateKeyHex;
+      let key;
+      if (session && !password) {
+        key = session.key;
+        privateKeyHex = await this.decryptWithKey(encrypted, key);
+      } else {
+        ({ data: privateKeyHex, key } = await this.decryptKey(encrypted, password));
+
+        // Upgrade ciphertexts from older KDF versions on unlock
+        if ((encrypted.v || 1) < KDF_VERSION) {
+          key = await this.migrateKey(walletId, privateKeyHex, password, key);
+        }
+      }
+
+      this.unlockSession(walletId, key);
 
       // Initialize Ark SDK wallet (placeholder - actual SDK integration needed)
       console.log('Wallet loaded successfully');
@@ -143,10 +181,75 @@ class ArkWalletCore {
       };
     } catch (error) {
       console.error('Load wallet error:', error);
+      this.lock(walletId);
       throw new Error('Failed to load wallet. Check your password.');
     }
   }
 
+  /**
+   * Re-encrypt a wallet key with the current KDF version
+   */
+  async migrateKey(walletId, privateKeyHex, password, oldKey) {
+    try {
+      const { encrypted, key } = await this.encryptKey(privateKeyHex, password);
+
+      const response = await fetch(`/ark_wallet/api/wallets/${walletId}/key`, {
+        method: 'PUT',
+        headers: {
+          'Content-Type': 'application/json',
+          'X-API-KEY': window.user.wallets[0].adminkey
+        },
+        body: JSON.stringify({ encrypted_key: JSON.stringify(encrypted) })
+      });
+
+      if (!response.ok) {
+        throw new Error('Failed to store upgraded key');
+      }
+
+      return key;
+    } catch (error) {
+      // Keep the old ciphertext, the upgrade is retried on next unlock
+      console.error('Key migration error:', error);
+      return oldKey;
+    }
+  }
+
+  /**
+   * Keep a wallet's derived key in memory until locked or timed out
+   */
+  unlockSession(walletId, key) {
+    this.lock(walletId);
+    const timer = setTimeout(() => this.lock(walletId), SESSION_TIMEOUT);
+    this.sessions.set(walletId, { key, timer });
+  }
+
+  /**
+   * Check whether a wallet can be loaded without its password
+   */
+  isUnlocked(walletId) {
+    return this.sessions.has(walletId);
+  }
+
+  /**
+   * Forget a wallet's derived key
+   */
+  lock(walletId) {
+    const session = this.sessions.get(walletId);
+    if (session) {
+      clearTimeout(session.timer);
+      this.sessions.delete(walletId);
+    }
+  }
+
+  /**
+   * Forget every derived key
+   */
+  lockAll() {
+    for (const walletId of Array.from(this.sessions.keys())) {
+      this.lock(walletId);
+    }
+  }
+
   /**
    * Get wallet address (placeholder for Ark SDK)
    */
@@ -212,43 +315,19 @@ class ArkWalletCore {
   }
 
   /**
-   * Create Boltz swap
+   * Create Boltz swap (swap code is loaded on first use)
    */
   async createBoltzSwap(walletId, swapType, amount, invoice = null, onchainAddress = null) {
-    try {
-      const data = {
-        wallet_id: walletId,
-        swap_type: swapType,
-        amount: amount,
-        invoice: invoice,
-        onchain_address: onchainAddress
-      };
-
-      const response = await fetch('/ark_wallet/api/swaps', {
-        method: 'POST',
-        headers: {
-          'Content-Type': 'application/json',
-          'X-API-KEY': window.user.wallets[0].adminkey
-        },
-        body: JSON.stringify(data)
-      });
-
-      if (!response.ok) {
-        throw new Error('Failed to create swap');
-      }
-
-      return await response.json();
-    } catch (error) {
-      console.error('Create swap error:', error);
-      throw error;
-    }
+    const { createBoltzSwap } = await import('./swap.js');
+    return createBoltzSwap(walletId, swapType, amount, invoice, onchainAddress);
   }
 
   /**
-   * Generate QR code for address
+   * Generate QR code for address (QR library is loaded on first use)
    */
   async generateQRCode(canvas, address) {
     try {
+      const { default: QRCode } = await import(QRCODE_URL);
       await QRCode.toCanvas(canvas, address, {
         width: 200,
         margin: 2,
@@ -263,17 +342,79 @@ class ArkWalletCore {
   }
 
   /**
-   * Encrypt private key using AES-GCM
+   * Derive an AES-GCM key from a password in the KDF worker
    */
-  async encryptKey(data, password) {
-    const salt = crypto.getRandomValues(new Uint8Array(16));
-    const iv = crypto.getRandomValues(new Uint8Array(12));
-    
-    const key = await crypto.subtle.deriveKey(
+  deriveKey(password, salt, iterations) {
+    if (typeof Worker === 'undefined' || this.kdfWorkerFailed) {
+      return this.deriveKeyInline(password, salt, iterations);
+    }
+
+    if (!this.kdfWorker) {
+      this.kdfWorker = new Worker(new URL('./kdf-worker.js', import.meta.url));
+      this.kdfWorker.onmessage = (event) => {
+        const { id, key, error } = event.data;
+        const request = this.kdfRequests.get(id);
+        if (!request) return;
+        this.kdfRequests.delete(id);
+        if (error) {
+          request.reject(new Error(error));
+        } else {
+          request.resolve(key);
+        }
+      };
+      // The worker failed to load (e.g. blocked by CSP), crashed or sent
+      // a key this browser cannot clone: derive on the main thread instead
+      this.kdfWorker.onerror = (event) => {
+        event.preventDefault();
+        this.fallBackFromWorker(event.message || 'KDF worker failed');
+      };
+      this.kdfWorker.onmessageerror = () => {
+        this.fallBackFromWorker('KDF worker reply could not be read');
+      };
+    }
+
+    const id = ++this.kdfRequestId;
+    return new Promise((resolve, reject) => {
+      this.kdfRequests.set(id, { resolve, reject, password, salt, iterations });
+      this.kdfWorker.postMessage({
+        id: id,
+        password: password,
+        salt: Array.from(salt),
+        iterations: iterations
+      });
+    });
+  }
+
+  /**
+   * Stop using the KDF worker and finish its pending requests inline
+   */
+  fallBackFromWorker(reason) {
+    console.warn(`${reason}, deriving keys on the main thread`);
+    this.kdfWorkerFailed = true;
+    this.kdfWorker.terminate();
+    this.kdfWorker = null;
+
+    const requests = [...this.kdfRequests.values()];
+    this.kdfRequests.clear();
+    for (const request of requests) {
+      this.deriveKeyInline(request.password, request.salt, request.iterations)
+        .then(request.resolve, request.reject);
+    }
+  }
+
+  /**
+   * Derive an AES-GCM key on the main thread, where workers are unavailable or failed
+   */
+  async deriveKeyInline(password, salt, iterations) {
+    if (iterations > INLINE_MAX_ITERATIONS) {
+      throw new Error('This wallet can only be unlocked in a browser with Web Workers enabled');
+    }
+
+    return crypto.subtle.deriveKey(
       {
         name: 'PBKDF2',
         salt: salt,
-        iterations: 100000,
+        iterations: iterations,
         hash: 'SHA-256'
       },
       await crypto.subtle.importKey(
@@ -285,8 +426,25 @@ class ArkWalletCore {
       ),
       { name: 'AES-GCM', length: 256 },
       false,
-      ['encrypt']
+      ['encrypt', 'decrypt']
     );
+  }
+
+  /**
+   * Encrypt private key using AES-GCM with the current KDF version
+   */
+  async encryptKey(data, password) {
+    const salt = crypto.getRandomValues(new Uint8Array(16));
+    const key = await this.deriveKey(password, salt, KDF_VERSIONS[KDF_VERSION].iterations);
+    const encrypted = await this.encryptWithKey(data, key, salt);
+    return { encrypted, key };
+  }
+
+  /**
+   * Encrypt with an already derived key
+   */
+  async encryptWithKey(data, key, salt) {
+    const iv = crypto.getRandomValues(new Uint8Array(12));
 
     const encrypted = await crypto.subtle.encrypt(
       { name: 'AES-GCM', iv: iv },
@@ -295,6 +453,7 @@ class ArkWalletCore {
     );
 
     return {
+      v: KDF_VERSION,
       iv: Array.from(iv),
       salt: Array.from(salt),
       data: Array.from(new Uint8Array(encrypted))
@@ -302,28 +461,27 @@ class ArkWalletCore {
   }
 
   /**
-   * Decrypt private key using AES-GCM
+   * Decrypt private key using AES-GCM, deriving the key from the password
    */
   async decryptKey(encrypted, password) {
-    const key = await crypto.subtle.deriveKey(
-      {
-        name: 'PBKDF2',
-        salt: new Uint8Array(encrypted.salt),
-        iterations: 100000,
-        hash: 'SHA-256'
-      },
-      await crypto.subtle.importKey(
-        'raw',
-        new TextEncoder().encode(password),
-        'PBKDF2',
-        false,
-        ['deriveKey']
-      ),
-      { name: 'AES-GCM', length: 256 },
-      false,
-      ['decrypt']
+    const params = KDF_VERSIONS[encrypted.v || 1];
+    if (!params) {
+      throw new Error(`Unsupported key version: ${encrypted.v}`);
+    }
+
+    const key = await this.deriveKey(
+      password,
+      new Uint8Array(encrypted.salt),
+      params.iterations
     );
+    const data = await this.decryptWithKey(encrypted, key);
+    return { data, key };
+  }
 
+  /**
+   * Decrypt with an already derived key
+   */
+  async decryptWithKey(encrypted, key) {
     const decrypted = await crypto.subtle.decrypt(
       { name: 'AES-GCM', iv: new Uint8Array(encrypted.iv) },
       key,
@@ -0,0 +1,36 @@
+/**
+ * Ark Wallet Key Derivation Worker
+ * Runs PBKDF2 off the main thread and returns a non-extractable AES-GCM key
+ */
+
+self.onmessage = async (event) => {
+  const { id, password, salt, iterations } = event.data;
+
+  try {
+    const baseKey = await crypto.subtle.importKey(
+      'raw',
+      new TextEncoder().encode(password),
+      'PBKDF2',
+      false,
+      ['deriveKey']
+    );
+
+    const key = await crypto.subtle.deriveKey(
+      {
+        name: 'PBKDF2',
+        salt: new Uint8Array(salt),
+        iterations: iterations,
+        hash: 'SHA-256'
+      },
+      baseKey,
+      { name: 'AES-GCM', length: 256 },
+      false,
+      ['encrypt', 'decrypt']
+    );
+
+    // CryptoKey is structured-cloneable and stays non-extractable
+    self.postMessage({ id, key });
+  } catch (error) {
+    self.postMessage({ id, error: error.message });
+  }
+};
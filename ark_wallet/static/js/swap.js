@@ -0,0 +1,37 @@
+/**
+ * Ark Wallet Swap Module
+ * Boltz swap operations, loaded on demand by the core module
+ */
+
+/**
+ * Create Boltz swap
+ */
+export async function createBoltzSwap(walletId, swapType, amount, invoice = null, onchainAddress = null) {
+  try {
+    const data = {
+      wallet_id: walletId,
+      swap_type: swapType,
+      amount: amount,
+      invoice: invoice,
+      onchain_address: onchainAddress
+    };
+
+    const response = await fetch('/ark_wallet/api/swaps', {
+      method: 'POST',
+      headers: {
+        'Content-Type': 'application/json',
+        'X-API-KEY': window.user.wallets[0].adminkey
+      },
+      body: JSON.stringify(data)
+    });
+
+    if (!response.ok) {
+      throw new Error('Failed to create swap');
+    }
+
+    return await response.json();
+  } catch (error) {
+    console.error('Create swap error:', error);
+    throw error;
+  }
+}
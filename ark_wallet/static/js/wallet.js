@@ -182,17 +182,21 @@ new Vue({
 
         if (!walletId) return;
 
-        const password = await this.$q.dialog({
-          title: 'Enter Password',
-          message: 'Enter your wallet password',
-          prompt: {
-            model: '',
-            type: 'password'
-          },
-          cancel: true
-        });
+        // Unlocked wallets reuse the session key instead of re-deriving it
+        let password = null;
+        if (!arkCore.isUnlocked(walletId)) {
+          password = await this.$q.dialog({
+            title: 'Enter Password',
+            message: 'Enter your wallet password',
+            prompt: {
+              model: '',
+              type: 'password'
+            },
+            cancel: true
+          });
 
-        if (!password) return;
+          if (!password) return;
+        }
 
         this.$q.loading.show({ message: 'Loading wallet...' });
 
@@ -532,6 +536,7 @@ new Vue({
         });
         
         // Clear current wallet
+        arkCore.lock(this.currentWallet.id);
         this.currentWallet = null;
         localStorage.removeItem('ark_last_wallet');
         
@@ -600,6 +605,7 @@ new Vue({
         confirmed: 'green',
         completed: 'green',
         failed: 'red',
+        refundable: 'red',
         refunded: 'orange'
       };
       return colors[status] || 'grey';
@@ -620,5 +626,6 @@ new Vue({
   beforeDestroy() {
     // Stop auto-refresh when component is destroyed
     arkCore.stopRefresh();
+    arkCore.lockAll();
   }
 });
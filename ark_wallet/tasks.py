@@ -0,0 +1,111 @@
+"""
+Background tasks for Ark Wallet Extension
+"""
+from functools import partial
+from typing import Dict, List, Optional, Set
+
+from .ark_client import ArkClientManager
+from .helpers import ARK_NETWORKS
+from .matcher import PaymentMatcher
+from .models import BoltzSwap, Vtxo
+from .scheduler import VtxoRenewalScheduler
+from .watchdog import EsploraBlockSource, SwapTimeoutWatchdog
+
+payment_matcher = PaymentMatcher()
+vtxo_schedulers: Dict[str, VtxoRenewalScheduler] = {}
+swap_watchdogs: Dict[str, SwapTimeoutWatchdog] = {}
+
+
+async def register_round_inputs(network: str, vtxos: List[Vtxo]) -> str:
+    """
+    Register VTXOs as inputs of the next Ark round, returns the request ID.
+
+    The server never holds wallet keys, so this only announces the
+    outpoints. The owner's intent signatures and forfeit transactions
+    have to come from a signer holding the key (the wallet's unlocked
+    browser session or a delegate). An Ark server enforcing intent
+    proofs leaves such a registration unconfirmed; the scheduler then
+    backs off per VTXO and marks it `expired` once it can no longer be
+    renewed in time, so the owner can refresh it from the wallet.
+    """
+    response = await ark_clients.request(
+        network,
+        "POST",
+        "/v1/round/registerInputs",
+        json={
+            "inputs": [
+                {"outpoint": {"txid": vtxo.txid, "vout": vtxo.vout}}
+                for vtxo in vtxos
+            ]
+        }
+    )
+    return response["requestId"]
+
+
+def get_vtxo_scheduler(network: str) -> VtxoRenewalScheduler:
+    """Get the VTXO renewal scheduler of a network"""
+    if network not in vtxo_schedulers:
+        vtxo_schedulers[network] = VtxoRenewalScheduler(network, register_round_inputs)
+    return vtxo_schedulers[network]
+
+
+async def run_vtxo_renewal(network: str):
+    """Run the VTXO renewal scheduler of a network"""
+    await get_vtxo_scheduler(network).run()
+
+
+async def on_round_finalized(network: str, event: dict) -> None:
+    """Confirm renewals and record payments to watched scripts of a finalized round"""
+    round_event = event.get("roundFinalized")
+    if not round_event:
+        return
+    
+    spent = [
+        f"{outpoint['txid']}:{outpoint['vout']}"
+        for outpoint in round_event.get("spentVtxos", [])
+    ]
+    scheduler = vtxo_schedulers.get(network)
+    if scheduler and spent:
+        await scheduler.confirm(round_event.get("id", ""), spent)
+    
+    await payment_matcher.process(network, round_event.get("outputs", []))
+
+
+def route_event(network: str, event: dict) -> Set[str]:
+    """Wallets a finalized round pays, by the scripts of its outputs"""
+    round_event = event.get("roundFinalized")
+    if not round_event:
+        return set()
+    return payment_matcher.wallets_for_outputs(network, round_event.get("outputs", []))
+
+
+ark_clients = ArkClientManager(router=route_event)
+
+for _network in ARK_NETWORKS:
+    ark_clients.add_listener(_network, partial(on_round_finalized, _network))
+
+
+async def run_ark_events(network: str):
+    """Follow the Ark server event stream of a network"""
+    await payment_matcher.load(network)
+    await ark_clients.stream_events(network)
+
+
+async def request_owner_refund(swap: BoltzSwap) -> Optional[str]:
+    """Refunds are signed with the wallet key, which only the owner holds"""
+    return None
+
+
+def get_swap_watchdog(network: str) -> SwapTimeoutWatchdog:
+    """Get the swap timeout watchdog of a network"""
+    if network not in swap_watchdogs:
+        swap_watchdogs[network] = SwapTimeoutWatchdog(network, request_owner_refund)
+    return swap_watchdogs[network]
+
+
+async def run_swap_watchdog(network: str):
+    """Refund the timed-out swaps of a network as blocks arrive"""
+    watchdog = get_swap_watchdog(network)
+    await watchdog.load()
+    source = EsploraBlockSource(ARK_NETWORKS[network]["esploraUrl"])
+    await watchdog.run(source.heights())
@@ -1,12 +1,15 @@
 """
 HTML Views for Ark Wallet Extension
 """
-from fastapi import Depends, Request
-from fastapi.responses import HTMLResponse
+import mimetypes
+
+from fastapi import Depends, HTTPException, Request
+from fastapi.responses import FileResponse, HTMLResponse
 from lnbits.core.models import User
 from lnbits.decorators import check_user_exists
 
 from . import ark_wallet_ext, ark_wallet_renderer
+from .helpers import DIST_DIR, static_assets
 
 
 @ark_wallet_ext.get("/", response_class=HTMLResponse)
@@ -16,3 +19,33 @@ async def index(request: Request, user: User = Depends(check_user_exists)):
         "ark_wallet/index.html",
         {"request": request, "user": user.dict()}
     )
+
+
+@ark_wallet_ext.get("/assets/{filename}")
+async def asset(filename: str, request: Request):
+    """Fingerprinted static asset, precompressed when the client accepts it"""
+    if filename not in static_assets():
+        raise HTTPException(status_code=404, detail="Asset not found")
+    
+    accepted = {
+        encoding.split(";")[0].strip()
+        for encoding in request.headers.get("accept-encoding", "").split(",")
+    }
+    
+    path = DIST_DIR / filename
+    headers = {
+        "Cache-Control": "public, max-age=31536000, immutable",
+        "Vary": "Accept-Encoding"
+    }
+    for encoding, suffix in (("br", ".br"), ("gzip", ".gz")):
+        compressed = DIST_DIR / f"{filename}{suffix}"
+        if encoding in accepted and compressed.is_file():
+            path = compressed
+            headers["Content-Encoding"] = encoding
+            break
+    
+    return FileResponse(
+        path,
+        media_type=mimetypes.guess_type(filename)[0],
+        headers=headers
+    )
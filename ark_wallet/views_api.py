@@ -1,12 +1,19 @@
 """
 API Views for Ark Wallet Extension
 """
-from fastapi import Depends, HTTPException, Query
+import asyncio
+import json
+
+from fastapi import Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from lnbits.core.models import User, WalletTypeInfo
 from lnbits.decorators import require_admin_key, require_invoice_key
 from typing import List
 
 from . import ark_wallet_ext
+from .helpers import ARK_NETWORKS, SWAP_STATUS_TRANSITIONS
+from .tasks import ark_clients, get_swap_watchdog, get_vtxo_scheduler, payment_matcher
+from .watchdog import REFUNDABLE_STATUSES
 from .crud import *
 from .models import *
 
@@ -17,23 +24,7 @@ from .models import *
 async def get_config():
     """Get wallet configuration"""
     return {
-        "networks": {
-            "mainnet": {
-                "arkServerUrl": "https://mainnet.arklabs.to",
-                "boltzApiUrl": "https://api.boltz.exchange",
-                "enabled": True
-            },
-            "testnet": {
-                "arkServerUrl": "https://testnet.arklabs.to",
-                "boltzApiUrl": "https://api.testnet.boltz.exchange",
-                "enabled": True
-            },
-            "mutinynet": {
-                "arkServerUrl": "https://master.mutinynet.arklabs.to",
-                "boltzApiUrl": "https://api.testnet.boltz.exchange",
-                "enabled": True
-            }
-        },
+        "networks": ARK_NETWORKS,
         "limits": {
             "minSwapAmount": 100000,  # 100k sats
             "maxSwapAmount": 25000000,  # 25M sats
@@ -111,6 +102,13 @@ async def delete_wallet(
     if ark_wallet.user != wallet.wallet.user:
         raise HTTPException(status_code=403, detail="Not authorized")
     
+    for address in await get_wallet_addresses(wallet_id):
+        payment_matcher.remove(address)
+    
+    scheduler = get_vtxo_scheduler(ark_wallet.network)
+    for vtxo in await get_wallet_vtxos(wallet_id):
+        scheduler.discard(vtxo.id)
+    
     await delete_ark_wallet(wallet_id)
     return {"success": True}
 
@@ -133,6 +131,56 @@ async def update_balance(
     return {"success": True, "balance": balance}
 
 
+@ark_wallet_ext.get("/api/wallets/{wallet_id}/events")
+async def wallet_events(
+    wallet_id: str,
+    request: Request,
+    wallet: WalletTypeInfo = Depends(require_invoice_key)
+):
+    """Stream Ark server events for a wallet's network (Server-Sent Events)"""
+    ark_wallet = await get_ark_wallet(wallet_id)
+    if not ark_wallet:
+        raise HTTPException(status_code=404, detail="Wallet not found")
+    
+    if ark_wallet.user != wallet.wallet.user:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    
+    async def event_stream():
+        # Subscribed only once the body is sent; a client gone before that
+        # never starts the generator, so its finally would never run
+        queue = ark_clients.subscribe(ark_wallet.network, wallet_id)
+        try:
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=15)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"data: {json.dumps(event)}\n\n"
+        finally:
+            ark_clients.unsubscribe(ark_wallet.network, wallet_id, queue)
+    
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+
+@ark_wallet_ext.put("/api/wallets/{wallet_id}/key")
+async def update_key(
+    wallet_id: str,
+    data: UpdateWalletKey,
+    wallet: WalletTypeInfo = Depends(require_admin_key)
+):
+    """Replace the encrypted wallet key"""
+    ark_wallet = await get_ark_wallet(wallet_id)
+    if not ark_wallet:
+        raise HTTPException(status_code=404, detail="Wallet not found")
+    
+    if ark_wallet.user != wallet.wallet.user:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    
+    await update_wallet_key(wallet_id, data.encrypted_key)
+    return {"success": True}
+
+
 # ==================== TRANSACTION ENDPOINTS ====================
 
 @ark_wallet_ext.get("/api/wallets/{wallet_id}/transactions")
@@ -216,6 +264,45 @@ async def create_swap(
     return swap.dict()
 
 
+@ark_wallet_ext.put("/api/swaps/{swap_id}")
+async def update_swap(
+    swap_id: str,
+    data: UpdateSwap,
+    wallet: WalletTypeInfo = Depends(require_admin_key)
+):
+    """Record Boltz swap progress"""
+    swap = await get_boltz_swap(swap_id)
+    if not swap:
+        raise HTTPException(status_code=404, detail="Swap not found")
+    
+    ark_wallet = await get_ark_wallet(swap.wallet_id)
+    if not ark_wallet or ark_wallet.user != wallet.wallet.user:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    
+    if data.status not in SWAP_STATUS_TRANSITIONS.get(swap.status, set()):
+        raise HTTPException(
+            status_code=400,
+            detail=f"Cannot change swap status from {swap.status} to {data.status}"
+        )
+    
+    if data.status == "refunded" and not data.refund_tx:
+        raise HTTPException(status_code=400, detail="Refunded swaps need a refund_tx")
+    
+    await update_boltz_swap(
+        swap.id,
+        data.status,
+        boltz_swap_id=data.boltz_swap_id,
+        timeout_block=data.timeout_block,
+        refund_tx=data.refund_tx
+    )
+    swap = await get_boltz_swap(swap.id)
+    
+    if swap.status in REFUNDABLE_STATUSES:
+        get_swap_watchdog(ark_wallet.network).watch(swap)
+    
+    return swap.dict()
+
+
 @ark_wallet_ext.get("/api/wallets/{wallet_id}/swaps")
 async def get_swaps(
     wallet_id: str,
@@ -252,6 +339,140 @@ async def get_swap_details(
     return swap.dict()
 
 
+# ==================== VTXO ENDPOINTS ====================
+
+@ark_wallet_ext.post("/api/wallets/{wallet_id}/vtxos")
+async def register_vtxo(
+    wallet_id: str,
+    data: CreateVtxo,
+    wallet: WalletTypeInfo = Depends(require_admin_key)
+):
+    """Register a VTXO for automatic renewal before expiry"""
+    ark_wallet = await get_ark_wallet(wallet_id)
+    if not ark_wallet:
+        raise HTTPException(status_code=404, detail="Wallet not found")
+    
+    if ark_wallet.user != wallet.wallet.user:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    
+    # Clients may report the same VTXO more than once
+    vtxo = await get_vtxo(f"{data.txid}:{data.vout}")
+    if vtxo:
+        if vtxo.wallet_id != wallet_id:
+            raise HTTPException(status_code=409, detail="VTXO belongs to another wallet")
+        return vtxo.dict()
+    
+    vtxo = await create_vtxo(ark_wallet, data)
+    get_vtxo_scheduler(ark_wallet.network).schedule(vtxo)
+    return vtxo.dict()
+
+
+@ark_wallet_ext.get("/api/wallets/{wallet_id}/vtxos")
+async def get_vtxos(
+    wallet_id: str,
+    wallet: WalletTypeInfo = Depends(require_invoice_key)
+) -> List[dict]:
+    """Get unspent VTXOs for a wallet"""
+    ark_wallet = await get_ark_wallet(wallet_id)
+    if not ark_wallet:
+        raise HTTPException(status_code=404, detail="Wallet not found")
+    
+    if ark_wallet.user != wallet.wallet.user:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    
+    vtxos = await get_wallet_vtxos(wallet_id)
+    return [vtxo.dict() for vtxo in vtxos]
+
+
+@ark_wallet_ext.delete("/api/wallets/{wallet_id}/vtxos/{vtxo_id}")
+async def spend_vtxo(
+    wallet_id: str,
+    vtxo_id: str,
+    wallet: WalletTypeInfo = Depends(require_admin_key)
+):
+    """Mark a VTXO as spent so it is no longer renewed"""
+    ark_wallet = await get_ark_wallet(wallet_id)
+    if not ark_wallet:
+        raise HTTPException(status_code=404, detail="Wallet not found")
+    
+    if ark_wallet.user != wallet.wallet.user:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    
+    vtxo = await get_vtxo(vtxo_id)
+    if not vtxo or vtxo.wallet_id != wallet_id:
+        raise HTTPException(status_code=404, detail="VTXO not found")
+    
+    await update_vtxos_status([vtxo_id], "spent")
+    
+    get_vtxo_scheduler(ark_wallet.network).discard(vtxo_id)
+    
+    return {"success": True}
+
+
+# ==================== ADDRESS ENDPOINTS ====================
+
+@ark_wallet_ext.post("/api/wallets/{wallet_id}/addresses")
+async def watch_address(
+    wallet_id: str,
+    data: CreateAddress,
+    wallet: WalletTypeInfo = Depends(require_admin_key)
+):
+    """Watch a receive address for incoming payments"""
+    ark_wallet = await get_ark_wallet(wallet_id)
+    if not ark_wallet:
+        raise HTTPException(status_code=404, detail="Wallet not found")
+    
+    if ark_wallet.user != wallet.wallet.user:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    
+    if await get_address_by_script(ark_wallet.network, data.script):
+        raise HTTPException(status_code=409, detail="Address already watched")
+    
+    address = await create_address(ark_wallet, data)
+    payment_matcher.add(address)
+    return address.dict()
+
+
+@ark_wallet_ext.get("/api/wallets/{wallet_id}/addresses")
+async def get_addresses(
+    wallet_id: str,
+    wallet: WalletTypeInfo = Depends(require_invoice_key)
+) -> List[dict]:
+    """Get watched addresses for a wallet"""
+    ark_wallet = await get_ark_wallet(wallet_id)
+    if not ark_wallet:
+        raise HTTPException(status_code=404, detail="Wallet not found")
+    
+    if ark_wallet.user != wallet.wallet.user:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    
+    addresses = await get_wallet_addresses(wallet_id)
+    return [address.dict() for address in addresses]
+
+
+@ark_wallet_ext.delete("/api/wallets/{wallet_id}/addresses/{address_id}")
+async def unwatch_address(
+    wallet_id: str,
+    address_id: str,
+    wallet: WalletTypeInfo = Depends(require_admin_key)
+):
+    """Stop watching a receive address"""
+    ark_wallet = await get_ark_wallet(wallet_id)
+    if not ark_wallet:
+        raise HTTPException(status_code=404, detail="Wallet not found")
+    
+    if ark_wallet.user != wallet.wallet.user:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    
+    address = await get_address(address_id)
+    if not address or address.wallet_id != wallet_id:
+        raise HTTPException(status_code=404, detail="Address not found")
+    
+    await delete_address(address_id)
+    payment_matcher.remove(address)
+    return {"success": True}
+
+
 # ==================== STATS ====================
 
 @ark_wallet_ext.get("/api/stats")
@@ -0,0 +1,130 @@
+"""
+Boltz swap timeout watchdog for Ark Wallet Extension
+"""
+import asyncio
+import heapq
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import httpx
+from loguru import logger
+
+from .crud import get_boltz_swap, get_pending_swap_timeouts_page, update_boltz_swap
+from .models import BoltzSwap
+
+# Submarine swaps whose lockup may still need refunding
+REFUNDABLE_STATUSES = ("pending", "failed")
+
+# Refunds a timed-out swap, returns the refund txid or None when the
+# refund has to be signed by the wallet owner
+RefundHandler = Callable[[BoltzSwap], Awaitable[Optional[str]]]
+
+
+class EsploraBlockSource:
+    """Yields the chain tip height of an Esplora API whenever it changes"""
+
+    def __init__(self, url: str, poll_interval: float = 30):
+        self.url = url
+        self.poll_interval = poll_interval
+
+    async def heights(self) -> AsyncIterator[int]:
+        last_height = None
+        async with httpx.AsyncClient(base_url=self.url, timeout=30) as client:
+            while True:
+                try:
+                    response = await client.get("/blocks/tip/height")
+                    response.raise_for_status()
+                    height = int(response.text)
+                    if height != last_height:
+                        last_height = height
+                        yield height
+                except (httpx.HTTPError, ValueError) as e:
+                    logger.warning(f"Ark Wallet: block height poll on {self.url} failed: {e}")
+                await asyncio.sleep(self.poll_interval)
+
+
+class SwapTimeoutWatchdog:
+    """
+    Triggers refunds for submarine swaps of one network once their
+    timeout block has been reached.
+
+    Unrefunded swaps are held in a min-heap of (timeout_block, id) loaded
+    once at startup and extended as swaps get a timeout. Each new block
+    only pops the swaps that timed out, so the swaps table is never
+    scanned per block. Every swap has at most one live heap entry; an
+    entry superseded by a later timeout is skipped when popped.
+    """
+
+    def __init__(self, network: str, refund: RefundHandler, load_limit: int = 10000):
+        self.network = network
+        self.refund = refund
+        self.load_limit = load_limit
+        self._heap: List[Tuple[int, str]] = []
+        # Swap ID -> timeout block of its live heap entry
+        self._timeouts: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._timeouts)
+
+    async def load(self) -> None:
+        """Load every unrefunded swap with a timeout"""
+        self._timeouts = {}
+        after_id = ""
+        while True:
+            page = await get_pending_swap_timeouts_page(
+                self.network, after_id, self.load_limit
+            )
+            self._timeouts.update(page)
+            if len(page) < self.load_limit:
+                break
+            after_id = page[-1][0]
+        self._heap = [(timeout_block, swap_id) for swap_id, timeout_block in self._timeouts.items()]
+        heapq.heapify(self._heap)
+
+    def watch(self, swap: BoltzSwap) -> None:
+        """Start watching a swap once its timeout block is known"""
+        if swap.swap_type == "submarine" and swap.timeout_block:
+            self._schedule(swap.id, swap.timeout_block)
+
+    def _schedule(self, swap_id: str, timeout_block: int) -> None:
+        if self._timeouts.get(swap_id) == timeout_block:
+            return
+        self._timeouts[swap_id] = timeout_block
+        heapq.heappush(self._heap, (timeout_block, swap_id))
+
+    async def on_block(self, height: int) -> None:
+        """Handle every swap whose timeout is at or below `height`"""
+        while self._heap and self._heap[0][0] <= height:
+            timeout_block, swap_id = heapq.heappop(self._heap)
+            if self._timeouts.get(swap_id) != timeout_block:
+                continue
+            del self._timeouts[swap_id]
+
+            swap = await get_boltz_swap(swap_id)
+            # Swaps settled since they were queued are dropped here
+            if not swap or swap.status not in REFUNDABLE_STATUSES:
+                continue
+            # The timeout may have been pushed back since
+            if swap.timeout_block and swap.timeout_block > height:
+                self._schedule(swap.id, swap.timeout_block)
+                continue
+
+            try:
+                refund_tx = await self.refund(swap)
+            except Exception as e:
+                logger.warning(f"Ark Wallet: refund of swap {swap.id} failed: {e}")
+                # Retried on the next block
+                self._schedule(swap_id, height + 1)
+                continue
+
+            if refund_tx:
+                await update_boltz_swap(swap.id, "refunded", refund_tx=refund_tx)
+            else:
+                await update_boltz_swap(swap.id, "refundable")
+            logger.info(
+                f"Ark Wallet: swap {swap.id} timed out at block {timeout_block}"
+            )
+
+    async def run(self, heights: AsyncIterator[int]) -> None:
+        """Follow a stream of block heights, e.g. EsploraBlockSource.heights()"""
+        async for height in heights:
+            await self.on_block(height)
@@ -0,0 +1,117 @@
+"""
+Event fan-out from one Ark event stream to 100k subscribed wallets
+
+Usage: python -m tests.benchmarks.bench_fanout [wallets] [events] [queue_size]
+
+Every wallet has a subscribed queue that is never drained, the worst case
+for memory. Each round event pays 1k random wallets, routed through the
+payment matcher's script index. After a warmup that fills every queue,
+reports latency per event and memory growth over `events` more events,
+plus the cost of one event concerning every wallet.
+"""
+import asyncio
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+from loguru import logger
+
+import tests.conftest  # noqa: F401  stubs LNbits when it is not installed
+from ark_wallet.ark_client import ArkClientManager
+from ark_wallet.matcher import PaymentMatcher
+from ark_wallet.models import WatchedAddress
+
+NETWORK = "mutinynet"
+
+
+def script(n: int) -> str:
+    return f"5120{n:064x}"
+
+
+PAID_PER_EVENT = 1000
+
+
+async def main(wallets: int, events: int, queue_size: int) -> None:
+    logger.remove()
+    random.seed(1)
+    matcher = PaymentMatcher()
+    for n in range(wallets):
+        matcher.add(
+            WatchedAddress(
+                id=str(n), wallet_id=f"wallet-{n}", network=NETWORK,
+                address=f"ark1{n}", script=script(n), created_at=datetime(2026, 1, 1)
+            )
+        )
+
+    def route(network, event):
+        if event.get("broadcast"):
+            return (f"wallet-{n}" for n in range(wallets))
+        return matcher.wallets_for_outputs(network, event["roundFinalized"]["outputs"])
+
+    clients = ArkClientManager(router=route, queue_size=queue_size)
+    for n in range(wallets):
+        clients.subscribe(NETWORK, f"wallet-{n}")
+
+    def round_event() -> dict:
+        paid = random.sample(range(wallets), PAID_PER_EVENT)
+        return {
+            "roundFinalized": {
+                "outputs": [
+                    {"txid": "00" * 32, "script": script(n), "amount": 1000} for n in paid
+                ]
+            }
+        }
+
+    async def publish_all(count: int) -> list:
+        latencies = []
+        for _ in range(count):
+            event = round_event()
+            start = time.perf_counter()
+            await clients.publish(NETWORK, event)
+            latencies.append((time.perf_counter() - start) * 1000)
+        return latencies
+
+    # Fill every queue, so later events only replace old ones; tracing
+    # starts first so that events freed later are accounted for
+    tracemalloc.start()
+    # An event is freed once all of its queues rotated past it, which
+    # takes several queue lengths
+    warmup = await publish_all(8 * wallets * queue_size // PAID_PER_EVENT)
+    full = sum(
+        1
+        for queues in clients._subscribers[NETWORK].values()
+        for queue in queues
+        if queue.full()
+    )
+    growth = []
+    latencies = []
+    for _ in range(2):
+        baseline = tracemalloc.get_traced_memory()[0]
+        latencies += await publish_all(events)
+        growth.append(tracemalloc.get_traced_memory()[0] - baseline)
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    await clients.publish(NETWORK, {"broadcast": True})
+    broadcast = (time.perf_counter() - start) * 1000
+
+    latencies.sort()
+    print(f"wallets subscribed:   {wallets}")
+    print(f"queues full:          {full} of {wallets} (size {queue_size})")
+    print(f"events published:     {len(warmup)} warmup + {events} "
+          f"x2 ({PAID_PER_EVENT} wallets paid each)")
+    print(f"latency per event:    p50 {statistics.median(latencies):.2f} ms, "
+          f"p99 {latencies[int(len(latencies) * 0.99)]:.2f} ms, warmup mean "
+          f"{statistics.mean(warmup):.2f} ms (all with tracing on)")
+    print(f"memory growth:        "
+          + ", then ".join(f"{g / 1024:.0f} KiB" for g in growth)
+          + f" over two windows of {events} events")
+    print(f"broadcast to all:     {broadcast:.1f} ms")
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:]]
+    asyncio.run(main(*(args + [100_000, 1000, 8][len(args):])))
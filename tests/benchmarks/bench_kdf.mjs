@@ -0,0 +1,105 @@
+/**
+ * PBKDF2-SHA256 cost of the wallet KDF versions and candidate upgrades
+ *
+ * Usage: node tests/benchmarks/bench_kdf.mjs [runs] [iterations...]
+ *
+ * Derives the AES-GCM wallet key through WebCrypto exactly as
+ * kdf-worker.js does, for every iteration count in KDF_VERSIONS of
+ * ark.js plus the given candidates (600k by default), and reports the
+ * time per unlock. It also measures how long a
+ * timer on the calling thread stalls while one derivation runs there
+ * and while it runs in a worker thread. Browsers use comparable native
+ * PBKDF2 code; open kdf_timing.html for in-browser numbers.
+ */
+import { readFileSync } from 'node:fs';
+import { performance } from 'node:perf_hooks';
+import { Worker } from 'node:worker_threads';
+
+const source = readFileSync(new URL('../../ark_wallet/static/js/ark.js', import.meta.url), 'utf8');
+const versions = [...source.matchAll(/(\d+): \{ kdf: 'PBKDF2-SHA256', iterations: (\d+) \}/g)]
+  .map(([, version, iterations]) => ({ version, iterations: Number(iterations) }));
+const candidates = (process.argv.length > 3 ? process.argv.slice(3) : ['600000'])
+  .map((iterations) => ({ version: 'candidate', iterations: Number(iterations) }));
+
+async function deriveKey(password, salt, iterations) {
+  const baseKey = await crypto.subtle.importKey(
+    'raw', new TextEncoder().encode(password), 'PBKDF2', false, ['deriveKey']
+  );
+  return crypto.subtle.deriveKey(
+    { name: 'PBKDF2', salt, iterations, hash: 'SHA-256' },
+    baseKey,
+    { name: 'AES-GCM', length: 256 },
+    false,
+    ['encrypt', 'decrypt']
+  );
+}
+
+const workerSource = `
+  const { parentPort } = require('node:worker_threads');
+  parentPort.on('message', async ({ salt, iterations }) => {
+    const baseKey = await crypto.subtle.importKey(
+      'raw', new TextEncoder().encode('correct horse battery staple'), 'PBKDF2', false, ['deriveKey']
+    );
+    await crypto.subtle.deriveKey(
+      { name: 'PBKDF2', salt: new Uint8Array(salt), iterations, hash: 'SHA-256' },
+      baseKey, { name: 'AES-GCM', length: 256 }, false, ['encrypt', 'decrypt']
+    );
+    parentPort.postMessage('done');
+  });
+`;
+
+// Longest gap between 4 ms timer ticks while `work` runs, i.e. how long
+// the calling thread could not paint or handle input
+async function longestStall(work) {
+  let last = performance.now();
+  let longest = 0;
+  const timer = setInterval(() => {
+    const now = performance.now();
+    longest = Math.max(longest, now - last);
+    last = now;
+  }, 4);
+  await new Promise((resolve) => setTimeout(resolve, 20));
+  await work();
+  // Let a tick held up by the work fire before stopping
+  await new Promise((resolve) => setTimeout(resolve, 20));
+  clearInterval(timer);
+  return longest;
+}
+
+function median(values) {
+  const sorted = [...values].sort((a, b) => a - b);
+  return sorted[Math.floor(sorted.length / 2)];
+}
+
+const runs = Number(process.argv[2] || 5);
+const salt = crypto.getRandomValues(new Uint8Array(16));
+const worker = new Worker(workerSource, { eval: true });
+const inWorker = (iterations) => new Promise((resolve) => {
+  worker.once('message', resolve);
+  worker.postMessage({ salt: Array.from(salt), iterations });
+});
+
+console.log(`${'version'.padEnd(11)}${'iterations'.padStart(11)}${'unlock p50'.padStart(13)}${'stall inline'.padStart(15)}${'stall worker'.padStart(15)}`);
+for (const { version, iterations } of [...versions, ...candidates]) {
+  await deriveKey('warmup', salt, 1000);
+  const timings = [];
+  for (let run = 0; run < runs; run++) {
+    const start = performance.now();
+    await deriveKey('correct horse battery staple', salt, iterations);
+    timings.push(performance.now() - start);
+  }
+  // WebCrypto in Node runs PBKDF2 on the libuv pool, so the inline stall
+  // is measured with the synchronous equivalent a main thread would see
+  const { pbkdf2Sync } = await import('node:crypto');
+  const inline = await longestStall(async () => {
+    pbkdf2Sync('correct horse battery staple', salt, iterations, 32, 'sha256');
+  });
+  const offThread = await longestStall(() => inWorker(iterations));
+  console.log(
+    `${String(version).padEnd(11)}${String(iterations).padStart(11)}` +
+    `${(median(timings).toFixed(0) + ' ms').padStart(13)}` +
+    `${(inline.toFixed(0) + ' ms').padStart(15)}` +
+    `${(offThread.toFixed(0) + ' ms').padStart(15)}`
+  );
+}
+await worker.terminate();
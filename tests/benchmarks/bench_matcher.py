@@ -0,0 +1,87 @@
+"""
+Matching round outputs against 1M watched scripts
+
+Usage: python -m tests.benchmarks.bench_matcher [scripts] [outputs] [batches]
+
+Loads `scripts` watched addresses into the payment matcher through the
+keyset-paged loader, then matches batches of `outputs` round outputs of
+which one in ten pays a watched script. Reports load time, the memory of
+the index dict and matching time per batch and per output.
+"""
+import asyncio
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+
+from loguru import logger
+
+import tests.conftest  # noqa: F401  stubs LNbits when it is not installed
+from ark_wallet import matcher as matcher_module
+from ark_wallet.matcher import PaymentMatcher
+
+NETWORK = "mutinynet"
+
+
+def script(n: int) -> str:
+    return f"5120{n:064x}"
+
+
+async def main(scripts: int, outputs: int, batches: int) -> None:
+    logger.remove()
+    random.seed(1)
+    rows = [(script(n), f"wallet-{n % 100000}") for n in range(scripts)]
+    pages = 0
+
+    async def get_watched_scripts_page(network, after_script, limit):
+        nonlocal pages
+        pages += 1
+        start = 0 if not after_script else int(after_script[4:], 16) + 1
+        return rows[start:start + limit]
+
+    matcher_module.get_watched_scripts_page = get_watched_scripts_page
+    matcher = PaymentMatcher()
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    await matcher.load(NETWORK)
+    load_time = time.perf_counter() - start
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del rows
+
+    def batch() -> list:
+        return [
+            {
+                "txid": f"{random.getrandbits(256):064x}",
+                "vout": vout,
+                "script": script(random.randrange(scripts))
+                if vout % 10 == 0
+                else script(scripts + random.getrandbits(32)),
+                "amount": 1000
+            }
+            for vout in range(outputs)
+        ]
+
+    timings = []
+    matched = 0
+    for _ in range(batches):
+        round_outputs = batch()
+        start = time.perf_counter()
+        matched += len(matcher.match(NETWORK, round_outputs))
+        timings.append(time.perf_counter() - start)
+
+    timings.sort()
+    p50 = statistics.median(timings)
+    print(f"scripts loaded         {len(matcher):,} in {pages:,} pages, {load_time:.2f} s")
+    print(f"index dict memory      {memory / 2**20:.0f} MiB (script strings shared with the DB rows)")
+    print(f"batches                {batches} x {outputs:,} outputs, {matched:,} matched")
+    print(f"match per batch        p50 {p50 * 1000:.1f} ms, max {timings[-1] * 1000:.1f} ms")
+    print(f"match per output       {p50 / outputs * 1e6:.2f} us")
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:]]
+    scripts, outputs, batches = (args + [1000000, 10000, 20][len(args):])[:3]
+    asyncio.run(main(scripts, outputs, batches))
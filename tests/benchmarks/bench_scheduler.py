@@ -0,0 +1,71 @@
+"""
+VTXO renewal scheduler against a stub Ark server with 1M VTXOs
+
+Usage: python -m tests.benchmarks.bench_scheduler [vtxos] [days]
+
+VTXOs of 10k wallets expire uniformly over `days`. The scheduler runs on
+a simulated clock; the stub server finalizes every registered round.
+Reports the number of rounds, batch sizes, rows read from the (fake)
+index and the wall time spent in the scheduler.
+"""
+import asyncio
+import random
+import sys
+import time
+
+from loguru import logger
+
+import tests.conftest  # noqa: F401  stubs LNbits when it is not installed
+from ark_wallet import scheduler as scheduler_module
+from ark_wallet.scheduler import VtxoRenewalScheduler
+from tests.fakes import FakeClock, FakeVtxoStore, StubArkServer, make_vtxo
+
+DAY = 24 * 3600
+
+
+async def main(count: int, days: int) -> None:
+    logger.remove()
+    random.seed(1)
+    start = time.perf_counter()
+    store = FakeVtxoStore(
+        [
+            make_vtxo(n, DAY + random.randrange(days * DAY), wallet_id=f"wallet-{n % 10000}")
+            for n in range(count)
+        ]
+    )
+    print(f"seeded {count} VTXOs in {time.perf_counter() - start:.1f}s")
+
+    store.install(scheduler_module)
+    clock = FakeClock(0)
+    server = StubArkServer()
+    scheduler = VtxoRenewalScheduler("mutinynet", server.register, clock=clock)
+
+    batches = []
+    peak_in_memory = 0
+    scheduler_time = 0.0
+    await scheduler.resume()
+    end = (days + 1) * DAY
+    while clock.now < end:
+        start = time.perf_counter()
+        delay = await scheduler.tick()
+        scheduler_time += time.perf_counter() - start
+        peak_in_memory = max(peak_in_memory, len(scheduler._vtxos))
+        if delay <= 0:
+            batches.extend(len(batch) for batch in server.registrations.values())
+            await server.finalize(scheduler)
+            continue
+        clock.now = min(clock.now + delay, end)
+
+    renewed = store.count("renewed")
+    print(f"renewed:            {renewed} / {count}")
+    print(f"rounds:             {len(batches)}")
+    print(f"batch size:         max {max(batches)}, mean {sum(batches) / len(batches):.1f}")
+    print(f"rows read:          {store.rows_read} in {store.page_queries} page queries")
+    print(f"peak VTXOs in heap: {peak_in_memory}")
+    print(f"scheduler time:     {scheduler_time:.2f}s "
+          f"({scheduler_time / len(batches) * 1000:.3f} ms per round)")
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:]]
+    asyncio.run(main(*(args + [1_000_000, 30][len(args):])))
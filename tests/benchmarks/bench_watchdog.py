@@ -0,0 +1,112 @@
+"""
+Swap timeout watchdog over a simulated chain with 1M open swaps
+
+Usage: python -m tests.benchmarks.bench_watchdog [swaps] [blocks]
+
+Loads `swaps` pending submarine swaps with timeouts spread over `blocks`
+blocks, then mines every block. Along the way half the swaps settle
+before their timeout and one in ten has its timeout postponed and is
+watched again, leaving stale heap entries behind. Reports load time,
+heap memory, time per block and how many swaps were read from the
+database compared to those actually due.
+"""
+import asyncio
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+from loguru import logger
+
+import tests.conftest  # noqa: F401  stubs LNbits when it is not installed
+from ark_wallet import watchdog as watchdog_module
+from ark_wallet.models import BoltzSwap
+from ark_wallet.watchdog import SwapTimeoutWatchdog
+
+NETWORK = "mutinynet"
+START_HEIGHT = 800000
+
+
+async def main(swaps: int, blocks: int) -> None:
+    logger.remove()
+    random.seed(1)
+    created_at = datetime(2026, 1, 1)
+    store = {
+        f"{n:08d}": BoltzSwap(
+            id=f"{n:08d}", wallet_id=f"wallet-{n % 100000}", swap_type="submarine",
+            amount=10000, swap_id=str(n), status="pending",
+            timeout_block=START_HEIGHT + random.randrange(1, blocks + 1),
+            created_at=created_at
+        )
+        for n in range(swaps)
+    }
+    ids = sorted(store)
+    reads = 0
+
+    async def get_pending_swap_timeouts_page(network, after_id, limit):
+        start = 0 if not after_id else int(after_id) + 1
+        return [(swap_id, store[swap_id].timeout_block) for swap_id in ids[start:start + limit]]
+
+    async def get_boltz_swap(swap_id):
+        nonlocal reads
+        reads += 1
+        return store.get(swap_id)
+
+    async def update_boltz_swap(swap_id, status, **kwargs):
+        store[swap_id].status = status
+
+    watchdog_module.get_pending_swap_timeouts_page = get_pending_swap_timeouts_page
+    watchdog_module.get_boltz_swap = get_boltz_swap
+    watchdog_module.update_boltz_swap = update_boltz_swap
+
+    refunded = 0
+
+    async def refund(swap):
+        nonlocal refunded
+        refunded += 1
+        return None
+
+    watchdog = SwapTimeoutWatchdog(NETWORK, refund)
+    tracemalloc.start()
+    start = time.perf_counter()
+    await watchdog.load()
+    load_time = time.perf_counter() - start
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    # Half settle before timing out, a tenth get a later timeout
+    for swap in random.sample(list(store.values()), swaps // 2):
+        swap.status = "completed"
+    postponed = 0
+    for swap in random.sample(list(store.values()), swaps // 10):
+        swap.timeout_block += random.randrange(1, 145)
+        watchdog.watch(swap)
+        watchdog.watch(swap)
+        postponed += 1
+
+    timings = []
+    for height in range(START_HEIGHT + 1, START_HEIGHT + blocks + 145):
+        start = time.perf_counter()
+        await watchdog.on_block(height)
+        timings.append(time.perf_counter() - start)
+
+    due = sum(1 for swap in store.values() if swap.status != "completed")
+    timings.sort()
+    print(f"swaps loaded           {swaps:,} in {load_time:.2f} s, heap and index {memory / 2**20:.0f} MiB")
+    print(f"postponed and rewatched {postponed:,} (twice each)")
+    print(f"blocks mined           {len(timings):,}")
+    print(
+        f"per block              p50 {statistics.median(timings) * 1000:.2f} ms, "
+        f"p99 {timings[int(len(timings) * 0.99)] * 1000:.2f} ms, "
+        f"max {timings[-1] * 1000:.2f} ms"
+    )
+    print(f"swaps read from db     {reads:,} for {swaps:,} swaps ({due:,} due, {refunded:,} refunded)")
+    print(f"left in watchdog       {len(watchdog)}")
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:]]
+    swaps, blocks = (args + [1000000, 4320][len(args):])[:2]
+    asyncio.run(main(swaps, blocks))
@@ -0,0 +1,75 @@
+"""
+Test setup for the Ark Wallet extension
+
+The extension runs inside LNbits. When LNbits itself is not installed,
+the handful of names the extension imports from it are stubbed so the
+plain classes (scheduler, matcher, watchdog, client manager) can be
+tested with their CRUD and HTTP layers replaced per test.
+"""
+import asyncio
+import sys
+import types
+import uuid
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def _stub_lnbits():
+    def module(name, **attrs):
+        mod = types.ModuleType(name)
+        mod.__dict__.update(attrs)
+        sys.modules[name] = mod
+        return mod
+
+    class Database:
+        def __init__(self, name):
+            self.name = name
+
+        async def execute(self, *args, **kwargs):
+            raise RuntimeError("database access must be stubbed in tests")
+
+        fetchone = fetchall = execute
+
+    async def catch_everything_and_restart(func):
+        await func()
+
+    def dependency(*args, **kwargs):
+        return None
+
+    module("lnbits")
+    module("lnbits.db", Database=Database)
+    module(
+        "lnbits.helpers",
+        urlsafe_short_hash=lambda: uuid.uuid4().hex[:22],
+        template_renderer=lambda *args, **kwargs: None
+    )
+    module("lnbits.tasks", catch_everything_and_restart=catch_everything_and_restart)
+    module("lnbits.core")
+    module("lnbits.core.models", User=object, WalletTypeInfo=object)
+    module(
+        "lnbits.decorators",
+        check_user_exists=dependency,
+        require_admin_key=dependency,
+        require_invoice_key=dependency
+    )
+
+
+try:
+    import lnbits  # noqa: F401
+except ImportError:
+    _stub_lnbits()
+
+
+@pytest.fixture
+def db(monkeypatch):
+    """The CRUD layer over a fresh, migrated in-memory SQLite database"""
+    from ark_wallet import crud
+
+    from .fakes import SqliteDatabase
+
+    database = asyncio.run(SqliteDatabase().migrate())
+    monkeypatch.setattr(crud, "db", database)
+    return database
@@ -0,0 +1,177 @@
+"""
+In-memory stand-ins for the CRUD layer
+"""
+import bisect
+import importlib
+import sqlite3
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from ark_wallet.models import Vtxo
+
+MIGRATIONS = [
+    "m001_initial",
+    "m002_vtxos",
+    "m003_addresses",
+    "m004_transaction_outputs",
+]
+
+
+class SqliteDatabase:
+    """The subset of lnbits.db.Database the CRUD layer uses, over in-memory SQLite"""
+
+    def __init__(self):
+        self.conn = sqlite3.connect(":memory:")
+        self.conn.row_factory = sqlite3.Row
+
+    def _query(self, query: str) -> str:
+        # One extension per SQLite file, so the schema prefix goes away
+        return query.replace("ark_wallet.", "")
+
+    async def execute(self, query: str, values: tuple = ()) -> None:
+        self.conn.execute(self._query(query), values)
+
+    async def fetchone(self, query: str, values: tuple = ()) -> Optional[dict]:
+        row = self.conn.execute(self._query(query), values).fetchone()
+        return dict(row) if row else None
+
+    async def fetchall(self, query: str, values: tuple = ()) -> List[dict]:
+        return [dict(row) for row in self.conn.execute(self._query(query), values)]
+
+    async def migrate(self) -> "SqliteDatabase":
+        for name in MIGRATIONS:
+            module = importlib.import_module(f"ark_wallet.migrations.{name}")
+            await getattr(module, name)(self)
+        return self
+
+
+def make_vtxo(n: int, expires_at: int, wallet_id: str = "wallet", network: str = "mutinynet") -> Vtxo:
+    txid = f"{n:064x}"
+    return Vtxo(
+        id=f"{txid}:0",
+        wallet_id=wallet_id,
+        network=network,
+        txid=txid,
+        vout=0,
+        amount=1000,
+        expires_at=expires_at,
+        status="pending",
+        created_at=datetime(2026, 1, 1)
+    )
+
+
+class FakeVtxoStore:
+    """The vtxos table, with the (network, status, expires_at, id) index as a sorted list"""
+
+    def __init__(self, vtxos: List[Vtxo] = ()):
+        self.rows: Dict[str, Vtxo] = {}
+        self._index: List[Tuple[int, str]] = []
+        self.page_queries = 0
+        self.rows_read = 0
+        for vtxo in vtxos:
+            self.rows[vtxo.id] = vtxo
+        self._index = sorted((vtxo.expires_at, vtxo.id) for vtxo in vtxos)
+
+    def add(self, vtxo: Vtxo) -> None:
+        self.rows[vtxo.id] = vtxo
+        bisect.insort(self._index, (vtxo.expires_at, vtxo.id))
+
+    def status(self, vtxo_id: str) -> str:
+        return self.rows[vtxo_id].status
+
+    def count(self, status: str) -> int:
+        return sum(1 for vtxo in self.rows.values() if vtxo.status == status)
+
+    async def get_pending_vtxos_page(self, network, until, after, limit) -> List[Vtxo]:
+        self.page_queries += 1
+        page = []
+        for i in range(bisect.bisect_right(self._index, after), len(self._index)):
+            expires_at, vtxo_id = self._index[i]
+            if expires_at > until or len(page) >= limit:
+                break
+            vtxo = self.rows[vtxo_id]
+            if vtxo.network == network and vtxo.status == "pending":
+                page.append(vtxo)
+        self.rows_read += len(page)
+        return page
+
+    async def update_vtxos_status(
+        self, vtxo_ids, status, round_id: Optional[str] = None, only_if=None
+    ) -> None:
+        for vtxo_id in vtxo_ids:
+            if only_if and self.rows[vtxo_id].status not in only_if:
+                continue
+            self.rows[vtxo_id].status = status
+            self.rows[vtxo_id].round_id = round_id
+
+    async def confirm_renewed_vtxos(self, vtxo_ids, round_id) -> None:
+        for vtxo_id in vtxo_ids:
+            if self.rows[vtxo_id].status == "registered":
+                self.rows[vtxo_id].status = "renewed"
+                self.rows[vtxo_id].round_id = round_id
+
+    async def get_registered_vtxos(self, network) -> List[Vtxo]:
+        return [
+            vtxo for vtxo in self.rows.values()
+            if vtxo.network == network and vtxo.status == "registered"
+        ]
+
+    async def release_renewing_vtxos(self, network) -> None:
+        for vtxo in self.rows.values():
+            if vtxo.network == network and vtxo.status == "renewing":
+                vtxo.status = "pending"
+
+    def install(self, module, monkeypatch=None) -> None:
+        setattr_ = monkeypatch.setattr if monkeypatch else setattr
+        for name in (
+            "get_pending_vtxos_page",
+            "update_vtxos_status",
+            "confirm_renewed_vtxos",
+            "get_registered_vtxos",
+            "release_renewing_vtxos",
+        ):
+            setattr_(module, name, getattr(self, name))
+
+
+class FakeClock:
+    def __init__(self, now: float = 0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class StubArkServer:
+    """Accepts round registrations and finalizes rounds on demand"""
+
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.registrations: Dict[str, List[Vtxo]] = {}
+        self.requests = 0
+        self.rounds = 0
+
+    async def register(self, network: str, vtxos: List[Vtxo]) -> str:
+        if self.fail:
+            raise ConnectionError("ark server unavailable")
+        self.requests += 1
+        request_id = f"request-{self.requests}"
+        self.registrations[request_id] = list(vtxos)
+        return request_id
+
+    async def finalize(self, scheduler) -> None:
+        """Finalize one round spending every registered VTXO"""
+        self.rounds += 1
+        spent = [vtxo.id for batch in self.registrations.values() for vtxo in batch]
+        self.registrations.clear()
+        await scheduler.confirm(f"round-{self.rounds}", spent)
+
+
+async def drive(scheduler, clock: FakeClock, until: float, on_round=None) -> None:
+    """Run a scheduler on a simulated clock until `until`"""
+    while clock.now < until:
+        delay = await scheduler.tick()
+        if delay <= 0:
+            if on_round:
+                await on_round()
+            continue
+        clock.now = min(clock.now + delay, until)
@@ -0,0 +1,123 @@
+import asyncio
+import json
+
+import httpx
+
+from ark_wallet.ark_client import ArkClientManager
+
+
+def route_by_wallets(network, event):
+    return event.get("wallets", [])
+
+
+def test_events_reach_only_the_wallets_they_concern():
+    clients = ArkClientManager(router=route_by_wallets)
+
+    async def scenario():
+        alice = clients.subscribe("mutinynet", "alice")
+        bob = clients.subscribe("mutinynet", "bob")
+        other_network = clients.subscribe("mainnet", "alice")
+        await clients.publish("mutinynet", {"wallets": ["alice"]})
+        return alice.qsize(), bob.qsize(), other_network.qsize()
+
+    assert asyncio.run(scenario()) == (1, 0, 0)
+
+
+def test_every_queue_of_a_wallet_receives_the_event():
+    clients = ArkClientManager(router=route_by_wallets)
+
+    async def scenario():
+        tabs = [clients.subscribe("mutinynet", "alice") for _ in range(3)]
+        await clients.publish("mutinynet", {"wallets": ["alice"]})
+        clients.unsubscribe("mutinynet", "alice", tabs[0])
+        await clients.publish("mutinynet", {"wallets": ["alice"]})
+        return [tab.qsize() for tab in tabs]
+
+    assert asyncio.run(scenario()) == [1, 2, 2]
+
+
+def test_full_queue_drops_its_oldest_event():
+    clients = ArkClientManager(router=route_by_wallets, queue_size=2)
+
+    async def scenario():
+        queue = clients.subscribe("mutinynet", "alice")
+        for n in range(5):
+            await clients.publish("mutinynet", {"wallets": ["alice"], "n": n})
+        return [queue.get_nowait()["n"] for _ in range(queue.qsize())]
+
+    assert asyncio.run(scenario()) == [3, 4]
+
+
+def test_listener_failure_does_not_stop_delivery():
+    clients = ArkClientManager(router=route_by_wallets)
+    seen = []
+
+    async def broken(event):
+        raise ValueError("boom")
+
+    async def listener(event):
+        seen.append(event)
+
+    clients.add_listener("mutinynet", broken)
+    clients.add_listener("mutinynet", listener)
+
+    async def scenario():
+        queue = clients.subscribe("mutinynet", "alice")
+        await clients.publish("mutinynet", {"wallets": ["alice"]})
+        return queue.qsize()
+
+    assert asyncio.run(scenario()) == 1
+    assert len(seen) == 1
+
+
+def test_event_stream_reconnects_after_failures():
+    calls = []
+
+    def stub_server(request):
+        calls.append(request.url.path)
+        if len(calls) == 1:
+            raise httpx.ConnectError("refused")
+        if len(calls) == 2:
+            return httpx.Response(503)
+        lines = [json.dumps({"result": {"n": len(calls)}}), ""]
+        return httpx.Response(200, content="\n".join(lines).encode())
+
+    clients = ArkClientManager(
+        min_backoff=0.001, max_backoff=0.01, transport=httpx.MockTransport(stub_server)
+    )
+    received = []
+
+    async def listener(event):
+        received.append(event["n"])
+
+    clients.add_listener("mutinynet", listener)
+
+    async def scenario():
+        task = asyncio.create_task(clients.stream_events("mutinynet"))
+        while len(received) < 2:
+            await asyncio.sleep(0.001)
+        task.cancel()
+        await clients.close()
+
+    asyncio.run(asyncio.wait_for(scenario(), timeout=5))
+
+    assert received[:2] == [3, 4]
+    assert set(calls) == {"/v1/events"}
+
+
+def test_requests_share_one_client_per_network():
+    def stub_server(request):
+        return httpx.Response(200, json={"requestId": "abc"})
+
+    clients = ArkClientManager(transport=httpx.MockTransport(stub_server))
+
+    async def scenario():
+        first = clients.client("mutinynet")
+        response = await clients.request("mutinynet", "POST", "/v1/round/registerInputs", json={})
+        assert clients.client("mutinynet") is first
+        assert clients.client("mainnet") is not first
+        await clients.close()
+        assert clients.client("mutinynet") is not first
+        return response
+
+    assert asyncio.run(scenario()) == {"requestId": "abc"}
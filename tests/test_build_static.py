@@ -0,0 +1,113 @@
+import asyncio
+import gzip
+import json
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from ark_wallet import helpers, views
+from ark_wallet.build_static import ASSETS, KEEP_BUILDS, build
+
+
+def test_build_fingerprints_and_compresses_every_asset(tmp_path):
+    dist = tmp_path / "dist"
+    manifest = build(dist_dir=dist)
+
+    assert list(manifest) == ASSETS
+    assert json.loads((dist / "manifest.json").read_text()) == manifest
+    for hashed in manifest.values():
+        content = (dist / hashed).read_bytes()
+        assert gzip.decompress((dist / f"{hashed}.gz").read_bytes()) == content
+    assert not list(dist.glob(".build-*"))
+
+
+def test_imports_point_at_hashed_modules(tmp_path):
+    dist = tmp_path / "dist"
+    manifest = build(dist_dir=dist)
+
+    ark = (dist / manifest["js/ark.js"]).read_text()
+    assert f"'./{manifest['js/kdf-worker.js']}'" in ark
+    assert f"'./{manifest['js/swap.js']}'" in ark
+    assert "'./swap.js'" not in ark
+    wallet = (dist / manifest["js/wallet.js"]).read_text()
+    assert f"'./{manifest['js/ark.js']}'" in wallet
+
+
+def test_build_is_deterministic(tmp_path):
+    assert build(dist_dir=tmp_path / "a") == build(dist_dir=tmp_path / "b")
+
+
+def test_static_url_follows_rebuilds(tmp_path, monkeypatch):
+    static = tmp_path / "static"
+    shutil.copytree(helpers.STATIC_DIR, static, ignore=shutil.ignore_patterns("dist"))
+    dist = static / "dist"
+    monkeypatch.setattr(helpers, "DIST_DIR", dist)
+
+    assert helpers.static_url("css/ark_wallet.css") == "/ark_wallet/static/css/ark_wallet.css"
+
+    first = build(static, dist)["css/ark_wallet.css"]
+    assert helpers.static_url("css/ark_wallet.css") == f"/ark_wallet/assets/{first}"
+
+    with open(static / "css" / "ark_wallet.css", "a") as css:
+        css.write("\n.ark-rebuilt { color: red; }\n")
+    second = build(static, dist)["css/ark_wallet.css"]
+    assert second != first
+    assert helpers.static_url("css/ark_wallet.css") == f"/ark_wallet/assets/{second}"
+
+
+@pytest.fixture
+def static(tmp_path, monkeypatch):
+    static = tmp_path / "static"
+    shutil.copytree(helpers.STATIC_DIR, static, ignore=shutil.ignore_patterns("dist"))
+    monkeypatch.setattr(helpers, "DIST_DIR", static / "dist")
+    monkeypatch.setattr(views, "DIST_DIR", static / "dist")
+    return static
+
+
+def rebuild(static, n: int) -> dict:
+    with open(static / "js" / "swap.js", "a") as swap:
+        swap.write(f"\n// build {n}\n")
+    return build(static, static / "dist")
+
+
+def fetch(filename: str):
+    request = SimpleNamespace(headers={"accept-encoding": "gzip"})
+    return asyncio.run(views.asset(filename, request))
+
+
+def test_earlier_builds_stay_servable_until_pruned(static):
+    builds = [rebuild(static, n) for n in range(KEEP_BUILDS + 1)]
+    first, kept = builds[0]["js/swap.js"], builds[1]["js/swap.js"]
+
+    # A page from the second build can still lazy-load its swap module
+    assert kept in helpers.static_assets()
+    assert str(fetch(kept).path) == str(static / "dist" / f"{kept}.gz")
+
+    assert first not in helpers.static_assets()
+    assert not (static / "dist" / first).exists()
+    with pytest.raises(HTTPException):
+        fetch(first)
+
+
+def test_builds_before_the_history_are_kept(static):
+    dist = static / "dist"
+    old = rebuild(static, 0)
+    (dist / "manifests.json").unlink()
+    rebuild(static, 1)
+
+    assert old["js/swap.js"] in helpers.static_assets()
+    assert (dist / old["js/swap.js"]).exists()
+
+
+def test_concurrent_builds_do_not_interfere(static):
+    with ThreadPoolExecutor(4) as pool:
+        manifests = list(pool.map(lambda _: build(static, static / "dist"), range(4)))
+
+    assert all(manifest == manifests[0] for manifest in manifests)
+    assert helpers.static_manifest() == manifests[0]
+    assert not list((static / "dist").glob(".build-*"))
+    for hashed in manifests[0].values():
+        assert (static / "dist" / hashed).is_file()
@@ -0,0 +1,103 @@
+import asyncio
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from ark_wallet import crud, matcher as matcher_module, views_api
+from ark_wallet.matcher import PaymentMatcher
+from ark_wallet.models import CreateAddress, CreateWallet, WatchedAddress
+
+
+def address(n: int, wallet_id: str, network: str = "mutinynet") -> WatchedAddress:
+    return WatchedAddress(
+        id=str(n),
+        wallet_id=wallet_id,
+        network=network,
+        address=f"ark1{n}",
+        script=f"5120{n:064x}",
+        created_at=datetime(2026, 1, 1)
+    )
+
+
+def output(n: int, vout: int = 0, amount: int = 1000) -> dict:
+    return {"txid": f"{n:064x}", "vout": vout, "script": f"5120{n:064x}", "amount": amount}
+
+
+def test_match_finds_only_watched_scripts():
+    matcher = PaymentMatcher()
+    matcher.add(address(1, "alice"))
+    matcher.add(address(2, "bob"))
+    matcher.add(address(3, "carol", network="mainnet"))
+
+    outputs = [output(1), output(3), output(4), dict(output(2), script=output(2)["script"].upper())]
+    received = matcher.match("mutinynet", outputs)
+
+    assert [(tx.wallet_id, tx.tx_type, tx.txid, tx.vout) for tx in received] == [
+        ("alice", "receive", f"{1:064x}", 0),
+        ("bob", "receive", f"{2:064x}", 0),
+    ]
+    assert matcher.wallets_for_outputs("mutinynet", outputs) == {"alice", "bob"}
+
+
+def test_removed_address_is_no_longer_matched():
+    matcher = PaymentMatcher()
+    matcher.add(address(1, "alice"))
+    matcher.remove(address(1, "alice"))
+
+    assert matcher.match("mutinynet", [output(1)]) == []
+    assert len(matcher) == 0
+
+
+def test_load_pages_a_network_by_script(monkeypatch):
+    scripts = sorted((f"5120{n:064x}", f"wallet-{n}") for n in range(25))
+    queries = []
+
+    async def get_watched_scripts_page(network, after_script, limit):
+        queries.append((network, after_script))
+        return [row for row in scripts if row[0] > after_script][:limit]
+
+    monkeypatch.setattr(matcher_module, "get_watched_scripts_page", get_watched_scripts_page)
+    matcher = PaymentMatcher(load_limit=10)
+    matcher.add(address(100, "added-meanwhile"))
+    asyncio.run(matcher.load("mutinynet"))
+
+    assert len(matcher) == 26
+    assert [after for _, after in queries] == ["", scripts[9][0], scripts[19][0]]
+
+
+async def create_wallet(name: str):
+    return await crud.create_ark_wallet(
+        "user", CreateWallet(wallet_name=name, encrypted_key="{}")
+    )
+
+
+def test_redelivered_round_is_recorded_once(db):
+    async def scenario():
+        alice = await create_wallet("alice")
+        matcher = PaymentMatcher()
+        matcher.add(address(1, alice.id))
+
+        outputs = [output(1, vout=0), output(1, vout=1), output(1, vout=0)]
+        await matcher.process("mutinynet", outputs)
+        await matcher.process("mutinynet", outputs)
+        return await crud.get_wallet_transactions(alice.id)
+
+    received = asyncio.run(scenario())
+
+    assert sorted(tx.vout for tx in received) == [0, 1]
+    assert {tx.tx_type for tx in received} == {"receive"}
+
+
+def test_watching_a_watched_script_conflicts(db):
+    async def scenario():
+        alice = await create_wallet("alice")
+        key = SimpleNamespace(wallet=SimpleNamespace(user="user"))
+        data = CreateAddress(address="ark1", script="5120" + "ab" * 32)
+        await views_api.watch_address(alice.id, data, key)
+        with pytest.raises(HTTPException) as error:
+            await views_api.watch_address(alice.id, data, key)
+        return error.value.status_code
+
+    assert asyncio.run(scenario()) == 409
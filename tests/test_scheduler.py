@@ -0,0 +1,330 @@
+import asyncio
+
+import pytest
+
+from ark_wallet import crud, scheduler as scheduler_module
+from ark_wallet.models import CreateVtxo, CreateWallet
+from ark_wallet.scheduler import VtxoRenewalScheduler
+
+from .fakes import FakeClock, FakeVtxoStore, StubArkServer, drive, make_vtxo
+
+DAY = 24 * 3600
+
+
+def make_scheduler(store, server, clock, monkeypatch, **kwargs):
+    store.install(scheduler_module, monkeypatch)
+    return VtxoRenewalScheduler("mutinynet", server.register, clock=clock, **kwargs)
+
+
+def test_batches_due_vtxos_of_all_wallets_into_one_round(monkeypatch):
+    clock = FakeClock(0)
+    store = FakeVtxoStore(
+        [make_vtxo(n, DAY // 2, wallet_id=f"wallet-{n}") for n in range(10)]
+        + [make_vtxo(100, 3 * DAY)]
+    )
+    server = StubArkServer()
+    scheduler = make_scheduler(store, server, clock, monkeypatch)
+
+    async def scenario():
+        await scheduler.resume()
+        await drive(scheduler, clock, 60)
+
+    asyncio.run(scenario())
+
+    assert len(server.registrations) == 1
+    (request_id, batch), = server.registrations.items()
+    assert len(batch) == 10
+    assert {store.status(vtxo.id) for vtxo in batch} == {"registered"}
+    assert {store.rows[vtxo.id].round_id for vtxo in batch} == {request_id}
+    assert store.status(make_vtxo(100, 0).id) == "pending"
+
+
+def test_vtxos_are_renewed_only_when_a_round_confirms_them(monkeypatch):
+    clock = FakeClock(0)
+    store = FakeVtxoStore([make_vtxo(n, DAY // 2) for n in range(5)])
+    server = StubArkServer()
+    scheduler = make_scheduler(store, server, clock, monkeypatch)
+
+    async def scenario():
+        await scheduler.resume()
+        await drive(scheduler, clock, 60)
+        assert store.count("registered") == 5
+        await server.finalize(scheduler)
+
+    asyncio.run(scenario())
+
+    assert store.count("renewed") == 5
+    assert {vtxo.round_id for vtxo in store.rows.values()} == {"round-1"}
+
+
+def test_unconfirmed_registration_is_retried_after_a_backoff(monkeypatch):
+    clock = FakeClock(0)
+    store = FakeVtxoStore([make_vtxo(n, DAY // 2) for n in range(5)])
+    server = StubArkServer()
+    scheduler = make_scheduler(
+        store, server, clock, monkeypatch, registration_timeout=300, retry_backoff=600
+    )
+
+    async def scenario():
+        await scheduler.resume()
+        await drive(scheduler, clock, 299)
+        assert len(server.registrations) == 1
+        await drive(scheduler, clock, 899)
+        assert len(server.registrations) == 1
+        assert store.count("pending") == 5
+        await drive(scheduler, clock, 960)
+
+    asyncio.run(scenario())
+
+    assert len(server.registrations) == 2
+    assert store.count("registered") == 5
+
+
+def test_rounds_are_rate_limited_and_capped(monkeypatch):
+    clock = FakeClock(0)
+    store = FakeVtxoStore([make_vtxo(n, DAY // 2) for n in range(25)])
+    server = StubArkServer()
+    scheduler = make_scheduler(
+        store, server, clock, monkeypatch, max_batch=10, min_round_interval=60
+    )
+    round_times = []
+
+    async def record_round():
+        round_times.append(clock.now)
+
+    async def scenario():
+        await scheduler.resume()
+        await drive(scheduler, clock, 150, on_round=record_round)
+
+    asyncio.run(scenario())
+
+    assert [len(batch) for batch in server.registrations.values()] == [10, 10, 5]
+    assert round_times == [0, 60, 120]
+
+
+def test_failed_registration_returns_batch_to_pending(monkeypatch):
+    clock = FakeClock(0)
+    store = FakeVtxoStore([make_vtxo(n, DAY // 2) for n in range(5)])
+    server = StubArkServer(fail=True)
+    scheduler = make_scheduler(store, server, clock, monkeypatch)
+
+    async def scenario():
+        await scheduler.resume()
+        await drive(scheduler, clock, 30)
+        assert store.count("pending") == 5
+        server.fail = False
+        await drive(scheduler, clock, 599)
+        assert store.count("pending") == 5
+        await drive(scheduler, clock, 660)
+
+    asyncio.run(scenario())
+
+    assert store.count("registered") == 5
+
+
+def test_restart_after_failed_round_picks_the_batch_up_again(monkeypatch):
+    clock = FakeClock(0)
+    store = FakeVtxoStore([make_vtxo(n, DAY // 2) for n in range(5)])
+    server = StubArkServer()
+    scheduler = make_scheduler(store, server, clock, monkeypatch)
+    update = store.update_vtxos_status
+    failures = {"left": 2}
+
+    async def flaky_update(vtxo_ids, status, round_id=None, only_if=None):
+        # The database goes away after the batch was marked renewing
+        if status != "renewing" and failures["left"]:
+            failures["left"] -= 1
+            raise ConnectionError("database unavailable")
+        await update(vtxo_ids, status, round_id, only_if)
+
+    monkeypatch.setattr(scheduler_module, "update_vtxos_status", flaky_update)
+
+    async def scenario():
+        await scheduler.resume()
+        with pytest.raises(ConnectionError):
+            await drive(scheduler, clock, 30)
+        assert store.count("renewing") == 5
+
+        # catch_everything_and_restart runs the same instance again
+        await scheduler.resume()
+        clock.now = 100
+        await drive(scheduler, clock, 130)
+
+    asyncio.run(scenario())
+
+    assert len(server.registrations) == 2
+    assert store.count("registered") == 5
+
+
+def test_restart_keeps_waiting_for_registered_rounds(monkeypatch):
+    clock = FakeClock(0)
+    store = FakeVtxoStore([make_vtxo(n, DAY // 2) for n in range(5)])
+    server = StubArkServer()
+    scheduler = make_scheduler(store, server, clock, monkeypatch)
+
+    async def scenario():
+        await scheduler.resume()
+        await drive(scheduler, clock, 30)
+
+        restarted = make_scheduler(store, server, clock, monkeypatch)
+        await restarted.resume()
+        await drive(restarted, clock, 60)
+        await server.finalize(restarted)
+
+    asyncio.run(scenario())
+
+    assert len(server.registrations) == 0
+    assert server.rounds == 1
+    assert store.count("renewed") == 5
+
+
+def test_discarded_vtxo_is_not_registered(monkeypatch):
+    clock = FakeClock(0)
+    vtxos = [make_vtxo(n, DAY // 2) for n in range(3)]
+    store = FakeVtxoStore(vtxos)
+    server = StubArkServer()
+    scheduler = make_scheduler(store, server, clock, monkeypatch, min_round_interval=0)
+
+    async def scenario():
+        await scheduler.resume()
+        await scheduler._refill(clock.now)
+        scheduler.discard(vtxos[0].id)
+        await drive(scheduler, clock, 30)
+
+    asyncio.run(scenario())
+
+    (batch,) = server.registrations.values()
+    assert {vtxo.id for vtxo in batch} == {vtxos[1].id, vtxos[2].id}
+
+
+def test_new_vtxos_are_scheduled_in_and_beyond_the_loaded_range(monkeypatch):
+    clock = FakeClock(0)
+    store = FakeVtxoStore()
+    server = StubArkServer()
+    scheduler = make_scheduler(store, server, clock, monkeypatch, min_round_interval=0)
+    soon = make_vtxo(1, DAY // 2)
+    later = make_vtxo(2, 5 * DAY)
+
+    async def scenario():
+        await scheduler.resume()
+        await scheduler.tick()
+        for vtxo in (soon, later):
+            store.add(vtxo)
+            scheduler.schedule(vtxo)
+        await drive(scheduler, clock, 60)
+        assert store.status(soon.id) == "registered"
+        assert store.status(later.id) == "pending"
+        await drive(scheduler, clock, 4 * DAY + 60)
+
+    asyncio.run(scenario())
+
+    assert store.status(later.id) == "registered"
+
+
+def test_paging_reads_each_row_once_in_expiry_order(monkeypatch):
+    clock = FakeClock(0)
+    store = FakeVtxoStore([make_vtxo(n, 3600 + n * 60) for n in range(1000)])
+    server = StubArkServer()
+    scheduler = make_scheduler(
+        store, server, clock, monkeypatch, load_limit=100, min_round_interval=0
+    )
+
+    async def scenario():
+        await scheduler.resume()
+        await drive(scheduler, clock, 2 * DAY, on_round=lambda: server.finalize(scheduler))
+
+    asyncio.run(scenario())
+
+    assert store.count("renewed") == 1000
+    assert store.rows_read == 1000
+
+
+@pytest.mark.parametrize("fail", [False, True])
+def test_vtxo_spent_during_registration_stays_spent(monkeypatch, fail):
+    clock = FakeClock(0)
+    vtxos = [make_vtxo(n, DAY // 2) for n in range(3)]
+    store = FakeVtxoStore(vtxos)
+    server = StubArkServer(fail=fail)
+    scheduler = make_scheduler(store, server, clock, monkeypatch)
+    spent = vtxos[0].id
+
+    async def register(network, batch):
+        # DELETE /api/wallets/{id}/vtxos/{vtxo_id} while the server answers
+        await store.update_vtxos_status([spent], "spent")
+        scheduler.discard(spent)
+        return await server.register(network, batch)
+
+    scheduler.renew = register
+
+    async def scenario():
+        await scheduler.resume()
+        await scheduler.tick()
+
+    asyncio.run(scenario())
+
+    assert store.status(spent) == "spent"
+    assert spent not in scheduler._vtxos and spent not in scheduler._vtxo_requests
+    assert store.count("registered" if not fail else "pending") == 2
+
+
+def test_guarded_status_update_leaves_other_rows_alone(db):
+    async def scenario():
+        wallet = await crud.create_ark_wallet(
+            "user", CreateWallet(wallet_name="w", encrypted_key="{}")
+        )
+        vtxos = [
+            await crud.create_vtxo(wallet, CreateVtxo(txid=f"{n:064x}", vout=0, amount=1000, expires_at=DAY))
+            for n in range(2)
+        ]
+        ids = [vtxo.id for vtxo in vtxos]
+        await crud.update_vtxos_status(ids, "renewing")
+        await crud.update_vtxos_status(ids[:1], "spent")
+        await crud.update_vtxos_status(ids, "pending", only_if=("renewing",))
+        return [(await crud.get_vtxo(vtxo_id)).status for vtxo_id in ids]
+
+    assert asyncio.run(scenario()) == ["spent", "pending"]
+
+
+def test_ignored_registrations_back_off_and_expire(monkeypatch):
+    clock = FakeClock(0)
+    vtxo = make_vtxo(1, DAY // 2)
+    store = FakeVtxoStore([vtxo])
+    server = StubArkServer()
+    scheduler = make_scheduler(
+        store, server, clock, monkeypatch,
+        registration_timeout=600, retry_backoff=600, max_retry_backoff=4 * 3600
+    )
+    round_times = []
+
+    async def record_round():
+        round_times.append(clock.now)
+
+    async def scenario():
+        await scheduler.resume()
+        # The server never finalizes a round
+        await drive(scheduler, clock, DAY, on_round=record_round)
+
+    asyncio.run(scenario())
+
+    gaps = [later - earlier for earlier, later in zip(round_times, round_times[1:])]
+    # Registration timeout plus a backoff doubling up to its cap
+    assert gaps == [1200, 1800, 3000, 5400, 10200, 15000]
+    assert store.status(vtxo.id) == "expired"
+    assert len(scheduler._backoff) == len(scheduler._vtxos) == 0
+
+
+def test_vtxos_past_expiry_are_not_registered(monkeypatch):
+    clock = FakeClock(DAY)
+    store = FakeVtxoStore([make_vtxo(1, DAY - 60), make_vtxo(2, 2 * DAY)])
+    server = StubArkServer()
+    scheduler = make_scheduler(store, server, clock, monkeypatch)
+
+    async def scenario():
+        await scheduler.resume()
+        await drive(scheduler, clock, DAY + 30)
+
+    asyncio.run(scenario())
+
+    (batch,) = server.registrations.values()
+    assert [vtxo.id for vtxo in batch] == [make_vtxo(2, 0).id]
+    assert store.status(make_vtxo(1, 0).id) == "expired"
@@ -0,0 +1,43 @@
+import asyncio
+from types import SimpleNamespace
+
+from ark_wallet import crud, views_api
+from ark_wallet.models import CreateWallet
+
+KEY = SimpleNamespace(wallet=SimpleNamespace(user="user"))
+
+
+class ConnectedRequest:
+    async def is_disconnected(self) -> bool:
+        return False
+
+
+def subscribers(network: str) -> dict:
+    return dict(views_api.ark_clients._subscribers[network])
+
+
+def test_event_stream_subscribes_only_while_the_body_is_sent(db):
+    async def scenario():
+        wallet = await crud.create_ark_wallet(
+            "user", CreateWallet(wallet_name="w", encrypted_key="{}")
+        )
+
+        # The client goes away before the response body is iterated
+        response = await views_api.wallet_events(wallet.id, ConnectedRequest(), KEY)
+        await response.body_iterator.aclose()
+        assert wallet.id not in subscribers(wallet.network)
+
+        response = await views_api.wallet_events(wallet.id, ConnectedRequest(), KEY)
+        body = response.body_iterator
+        first = asyncio.ensure_future(body.__anext__())
+        await asyncio.sleep(0)
+        assert len(subscribers(wallet.network)[wallet.id]) == 1
+
+        (queue,) = subscribers(wallet.network)[wallet.id]
+        queue.put_nowait({"roundFinalized": {"id": "round-1"}})
+        chunk = await first
+        await body.aclose()
+        assert wallet.id not in subscribers(wallet.network)
+        return chunk
+
+    assert asyncio.run(scenario()) == 'data: {"roundFinalized": {"id": "round-1"}}\n\n'
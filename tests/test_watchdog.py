@@ -0,0 +1,172 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from ark_wallet import crud, tasks, views_api
+from ark_wallet.models import CreateSwap, CreateWallet, UpdateSwap
+from ark_wallet.watchdog import SwapTimeoutWatchdog
+
+KEY = SimpleNamespace(wallet=SimpleNamespace(user="user"))
+
+
+class Refunds:
+    def __init__(self, refund_tx=None, fail=0):
+        self.refund_tx = refund_tx
+        self.fail = fail
+        self.swaps = []
+
+    async def __call__(self, swap):
+        if self.fail:
+            self.fail -= 1
+            raise RuntimeError("refund broadcast failed")
+        self.swaps.append(swap.id)
+        return self.refund_tx
+
+
+async def create_swap(timeout_block=None, status="pending", swap_type="submarine", network="mutinynet"):
+    wallet = await crud.create_ark_wallet(
+        "user", CreateWallet(wallet_name="w", network=network, encrypted_key="{}")
+    )
+    swap = await crud.create_boltz_swap(
+        CreateSwap(wallet_id=wallet.id, swap_type=swap_type, amount=10000)
+    )
+    await crud.update_boltz_swap(swap.id, status, timeout_block=timeout_block)
+    return await crud.get_boltz_swap(swap.id)
+
+
+def test_load_and_refund_timed_out_swaps(db):
+    async def scenario():
+        due = await create_swap(100)
+        failed = await create_swap(100, status="failed")
+        later = await create_swap(200)
+        await create_swap(100, status="completed")
+        await create_swap(100, swap_type="reverse")
+        await create_swap(100, network="mainnet")
+        await create_swap()
+
+        refunds = Refunds()
+        watchdog = SwapTimeoutWatchdog("mutinynet", refunds, load_limit=2)
+        await watchdog.load()
+        assert len(watchdog) == 3
+
+        await watchdog.on_block(150)
+        assert sorted(refunds.swaps) == sorted([due.id, failed.id])
+        assert len(watchdog) == 1
+        statuses = [(await crud.get_boltz_swap(swap.id)).status for swap in (due, failed, later)]
+        return statuses
+
+    assert asyncio.run(scenario()) == ["refundable", "refundable", "pending"]
+
+
+def test_refund_tx_marks_swap_refunded(db):
+    async def scenario():
+        swap = await create_swap(100)
+        watchdog = SwapTimeoutWatchdog("mutinynet", Refunds(refund_tx="ab" * 32))
+        watchdog.watch(swap)
+        await watchdog.on_block(100)
+        return await crud.get_boltz_swap(swap.id)
+
+    swap = asyncio.run(scenario())
+    assert (swap.status, swap.refund_tx) == ("refunded", "ab" * 32)
+
+
+def test_watching_twice_keeps_one_entry(db):
+    async def scenario():
+        swap = await create_swap(100)
+        refunds = Refunds()
+        watchdog = SwapTimeoutWatchdog("mutinynet", refunds)
+        watchdog.watch(swap)
+        watchdog.watch(swap)
+        assert len(watchdog._heap) == 1
+        await watchdog.on_block(100)
+        return refunds.swaps
+
+    assert len(asyncio.run(scenario())) == 1
+
+
+def test_postponed_timeout_skips_the_stale_entry(db):
+    async def scenario():
+        swap = await create_swap(100)
+        refunds = Refunds()
+        watchdog = SwapTimeoutWatchdog("mutinynet", refunds)
+        watchdog.watch(swap)
+
+        await crud.update_boltz_swap(swap.id, "pending", timeout_block=120)
+        watchdog.watch(await crud.get_boltz_swap(swap.id))
+        await watchdog.on_block(110)
+        assert refunds.swaps == [] and len(watchdog) == 1
+
+        # Postponed in the database only, found out when the entry pops
+        await crud.update_boltz_swap(swap.id, "pending", timeout_block=130)
+        await watchdog.on_block(120)
+        assert refunds.swaps == [] and len(watchdog) == 1
+
+        await watchdog.on_block(130)
+        return refunds.swaps
+
+    assert len(asyncio.run(scenario())) == 1
+
+
+def test_failed_refund_is_retried_next_block(db):
+    async def scenario():
+        swap = await create_swap(100)
+        refunds = Refunds(fail=1)
+        watchdog = SwapTimeoutWatchdog("mutinynet", refunds)
+        watchdog.watch(swap)
+        await watchdog.on_block(100)
+        assert refunds.swaps == []
+        await watchdog.on_block(101)
+        return refunds.swaps
+
+    assert len(asyncio.run(scenario())) == 1
+
+
+def test_settled_swap_is_dropped(db):
+    async def scenario():
+        swap = await create_swap(100)
+        refunds = Refunds()
+        watchdog = SwapTimeoutWatchdog("mutinynet", refunds)
+        watchdog.watch(swap)
+        await crud.update_boltz_swap(swap.id, "completed")
+        await watchdog.on_block(100)
+        return refunds.swaps, len(watchdog)
+
+    assert asyncio.run(scenario()) == ([], 0)
+
+
+@pytest.mark.parametrize(
+    "status, update",
+    [
+        ("completed", UpdateSwap(status="pending")),
+        ("pending", UpdateSwap(status="refundable")),
+        ("refunded", UpdateSwap(status="failed")),
+        ("failed", UpdateSwap(status="refunded")),
+        ("pending", UpdateSwap(status="refunded", refund_tx="ab" * 32)),
+    ]
+)
+def test_update_swap_rejects_invalid_transitions(db, status, update):
+    async def scenario():
+        swap = await create_swap(100, status=status)
+        with pytest.raises(HTTPException) as error:
+            await views_api.update_swap(swap.id, update, KEY)
+        return error.value.status_code, (await crud.get_boltz_swap(swap.id)).status
+
+    assert asyncio.run(scenario()) == (400, status)
+
+
+def test_update_swap_watches_failed_swaps_and_records_refunds(db, monkeypatch):
+    monkeypatch.setattr(tasks, "swap_watchdogs", {})
+
+    async def scenario():
+        swap = await create_swap()
+        await views_api.update_swap(swap.id, UpdateSwap(status="failed", timeout_block=100), KEY)
+        assert len(tasks.swap_watchdogs["mutinynet"]) == 1
+
+        return await views_api.update_swap(
+            swap.id, UpdateSwap(status="refunded", refund_tx="ab" * 32), KEY
+        )
+
+    swap = asyncio.run(scenario())
+    assert (swap["status"], swap["refund_tx"]) == ("refunded", "ab" * 32)